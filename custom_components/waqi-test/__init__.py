@@ -1,49 +1,81 @@
 from __future__ import annotations
 
-from datetime import timedelta
-
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from waqi_client_async import WAQIClient
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     CONF_API_TOKEN,
-    CONF_UPDATE_INTERVAL,
-    DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
+    HOME_UNIQUE_ID,
     LOGGER,
+    SIGNAL_STATIONS_UPDATED,
+)
+from .coordinator import (
+    WAQIDataUpdateCoordinator,
+    async_get_hub,
+    async_release_hub,
 )
+from .home import HomeCoordinator
+from .services import async_setup_services
+from .store import async_get_feed_cache
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services shared by all entries."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up from a config entry."""
+    if entry.unique_id == HOME_UNIQUE_ID:
+        return await async_setup_home_entry(hass, entry)
 
-    client = WAQIClient(
-        token=entry.options[CONF_API_TOKEN],
-        session=async_get_clientsession(hass),
-    )
+    feed_cache = await async_get_feed_cache(hass)
+    hub = async_get_hub(hass, entry.options[CONF_API_TOKEN])
+    coordinator = WAQIDataUpdateCoordinator(hass, hub, entry, feed_cache)
 
-    async def coordinator_async_get():
-        try:
-            return await client.feed(f"{entry.unique_id}")
-        except e:
-            raise UpdateFailed(e) from e
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        LOGGER,
-        name="WAQI",
-        update_method=coordinator_async_get,
-        update_interval=timedelta(seconds=entry.options[CONF_UPDATE_INTERVAL]),
-    )
+    # Start from the last stored snapshot so setup does not wait on the
+    # network; the hub refreshes it in the station's phase slot, so a
+    # restart does not send every station's request at once. A snapshot
+    # too old to serve is fetched again right away.
+    if (cached := feed_cache.get(coordinator.station_id)) is not None:
+        coordinator.async_restore(cached)
+    if not coordinator.has_usable_data:
+        await coordinator.async_config_entry_first_refresh()
+
+    hub.async_add_coordinator(coordinator)
+    entry.async_on_unload(coordinator.async_cancel_stale)
+
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][entry.entry_id] = {
+        "coordinator": coordinator,
+    }
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    return True
+
+
+async def async_setup_home_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up the sensors interpolated at the home location."""
+    coordinator = HomeCoordinator(hass, entry)
     await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_STATIONS_UPDATED, coordinator.async_interpolate
+        )
+    )
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
@@ -52,7 +84,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     return True
 
@@ -62,11 +94,41 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)["coordinator"]
+        if isinstance(coordinator, WAQIDataUpdateCoordinator):
+            coordinator.hub.async_remove_coordinator(coordinator)
+            async_release_hub(hass, coordinator.hub)
 
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle an options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the cached snapshot of a removed station."""
+    feed_cache = await async_get_feed_cache(hass)
+    feed_cache.async_remove(f"{entry.unique_id}")
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply an options update to the running coordinator, without a reload."""
+    coordinator: WAQIDataUpdateCoordinator | HomeCoordinator = hass.data[DOMAIN][
+        entry.entry_id
+    ]["coordinator"]
+    coordinator.async_apply_options(entry.options)
+    if isinstance(coordinator, HomeCoordinator):
+        coordinator.async_interpolate()
+        return
+
+    old_hub = coordinator.hub
+    if entry.options[CONF_API_TOKEN] == old_hub.token:
+        old_hub.async_update_coordinator(coordinator)
+        return
+
+    LOGGER.debug("Moving %s to another API token", entry.title)
+    old_hub.async_remove_coordinator(coordinator)
+    async_release_hub(hass, old_hub)
+    coordinator.hub = async_get_hub(hass, entry.options[CONF_API_TOKEN])
+    coordinator.hub.async_add_coordinator(coordinator)
+
+    # Data rejected with the old token is refreshed right away.
+    if not coordinator.last_update_success:
+        await coordinator.async_request_refresh()
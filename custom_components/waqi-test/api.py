@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from aiohttp import ClientSession
+
+import waqi_client_async as waqi
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+API_URL = "https://api.waqi.info"
+
+
+def loads(body: bytes) -> Any:
+    """Decode a response body, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def raise_for_status(payload: dict[str, Any]) -> Any:
+    """Return the payload data or raise the matching client exception."""
+    if payload.get("status") == "ok":
+        return payload["data"]
+
+    message = payload.get("data")
+    if message == "Unknown station":
+        return None
+    if message == "Over quota":
+        raise waqi.OverQuota(message)
+    if message == "Invalid key":
+        raise waqi.InvalidToken(message)
+    raise ValueError(f"Unexpected WAQI response: {message}")
+
+
+async def async_get_bounds(
+    session: ClientSession,
+    token: str,
+    bounds: tuple[float, float, float, float],
+) -> list[dict[str, Any]]:
+    """Return the AQI of every station inside a (lat1, lng1, lat2, lng2) box."""
+    async with session.get(
+        f"{API_URL}/map/bounds/",
+        params={"latlng": ",".join(f"{value:.4f}" for value in bounds), "token": token},
+    ) as response:
+        response.raise_for_status()
+        return raise_for_status(loads(await response.read()))
+
+
+async def async_get_feed(
+    session: ClientSession, token: str, station: str
+) -> dict[str, Any] | None:
+    """Return the feed of a station, or None when it does not exist.
+
+    The body is read as bytes and decoded with the fastest available
+    backend instead of going through aiohttp's stdlib based json().
+    """
+    async with session.get(
+        f"{API_URL}/feed/{station}/", params={"token": token}
+    ) as response:
+        response.raise_for_status()
+        return raise_for_status(loads(await response.read()))
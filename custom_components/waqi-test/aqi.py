@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+SCALE_US_EPA = "us_epa"
+SCALE_EU_CAQI = "eu_caqi"
+SCALE_UK_DAQI = "uk_daqi"
+SCALE_CHINA = "china"
+SCALES = (SCALE_US_EPA, SCALE_EU_CAQI, SCALE_UK_DAQI, SCALE_CHINA)
+
+POLLUTANTS = ("pm25", "pm10", "o3", "no2", "so2", "co")
+
+# WAQI publishes US EPA sub-indices. Their breakpoints use ppb for the gases
+# and ppm for CO; these factors convert them to ug/m3 (mg/m3 for CO) at 25 C.
+EPA_UNIT_FACTORS = {
+    "pm25": 1.0,
+    "pm10": 1.0,
+    "o3": 1.96,
+    "no2": 1.88,
+    "so2": 2.62,
+    "co": 1.145,
+}
+
+Breakpoints = tuple[tuple[float, ...], tuple[float, ...]]
+
+AQI_KNOTS = (0, 50, 100, 150, 200, 300, 400, 500)
+CAQI_KNOTS = (0, 25, 50, 75, 100)
+
+# Piecewise linear scales: (concentration knots, index knots) per pollutant,
+# concentrations in ug/m3 except CO in mg/m3. US EPA is in its own units.
+LINEAR_SCALES: dict[str, dict[str, Breakpoints]] = {
+    SCALE_US_EPA: {
+        "pm25": ((0, 12, 35.4, 55.4, 150.4, 250.4, 350.4, 500.4), AQI_KNOTS),
+        "pm10": ((0, 54, 154, 254, 354, 424, 504, 604), AQI_KNOTS),
+        "o3": ((0, 54, 70, 85, 105, 200, 504, 604), AQI_KNOTS),
+        "no2": ((0, 53, 100, 360, 649, 1249, 1649, 2049), AQI_KNOTS),
+        "so2": ((0, 35, 75, 185, 304, 604, 804, 1004), AQI_KNOTS),
+        "co": ((0, 4.4, 9.4, 12.4, 15.4, 30.4, 40.4, 50.4), AQI_KNOTS),
+    },
+    SCALE_EU_CAQI: {
+        "pm25": ((0, 15, 30, 55, 110), CAQI_KNOTS),
+        "pm10": ((0, 25, 50, 90, 180), CAQI_KNOTS),
+        "o3": ((0, 60, 120, 180, 240), CAQI_KNOTS),
+        "no2": ((0, 50, 100, 200, 400), CAQI_KNOTS),
+        "so2": ((0, 50, 100, 350, 500), CAQI_KNOTS),
+        "co": ((0, 5, 7.5, 10, 20), CAQI_KNOTS),
+    },
+    SCALE_CHINA: {
+        "pm25": ((0, 35, 75, 115, 150, 250, 350, 500), AQI_KNOTS),
+        "pm10": ((0, 50, 150, 250, 350, 420, 500, 600), AQI_KNOTS),
+        "o3": ((0, 160, 200, 300, 400, 800, 1000, 1200), AQI_KNOTS),
+        "no2": ((0, 40, 80, 180, 280, 565, 750, 940), AQI_KNOTS),
+        "so2": ((0, 50, 150, 475, 800, 1600, 2100, 2620), AQI_KNOTS),
+        "co": ((0, 2, 4, 14, 24, 36, 48, 60), AQI_KNOTS),
+    },
+}
+
+# UK DAQI is banded 1-10: upper concentration bound (ug/m3) of bands 1-9.
+BANDED_SCALES: dict[str, dict[str, tuple[float, ...]]] = {
+    SCALE_UK_DAQI: {
+        "pm25": (11, 23, 35, 41, 47, 53, 58, 64, 70),
+        "pm10": (16, 33, 50, 58, 66, 75, 83, 91, 100),
+        "o3": (33, 66, 100, 120, 140, 160, 187, 213, 240),
+        "no2": (67, 134, 200, 267, 334, 400, 467, 534, 600),
+        "so2": (88, 177, 266, 354, 443, 532, 710, 887, 1064),
+    },
+}
+
+
+def _interpolate(
+    value: float, xs: tuple[float, ...], ys: tuple[float, ...]
+) -> float:
+    """Interpolate linearly between knots, extrapolating past the last one."""
+    position = min(max(bisect_right(xs, value), 1), len(xs) - 1)
+    x0, x1 = xs[position - 1], xs[position]
+    y0, y1 = ys[position - 1], ys[position]
+    return y0 + (value - x0) * (y1 - y0) / (x1 - x0)
+
+
+def concentration_from_epa(pollutant: str, index: float) -> float:
+    """Return the concentration behind a US EPA sub-index."""
+    concentrations, indices = LINEAR_SCALES[SCALE_US_EPA][pollutant]
+    return _interpolate(index, indices, concentrations) * EPA_UNIT_FACTORS[pollutant]
+
+
+def sub_index(scale: str, pollutant: str, concentration: float) -> float | None:
+    """Return the sub-index of a concentration on a scale."""
+    if scale in BANDED_SCALES:
+        if (bands := BANDED_SCALES[scale].get(pollutant)) is None:
+            return None
+        return float(bisect_left(bands, concentration) + 1)
+
+    if (breakpoints := LINEAR_SCALES[scale].get(pollutant)) is None:
+        return None
+    concentrations, indices = breakpoints
+    if scale == SCALE_US_EPA:
+        concentration /= EPA_UNIT_FACTORS[pollutant]
+    return _interpolate(concentration, concentrations, indices)
+
+
+def compute_aqi(
+    iaqi: Mapping[str, float | str | None], scale: str
+) -> tuple[int | None, str | None]:
+    """Return the composite index and dominant pollutant from WAQI sub-indices."""
+    best: float | None = None
+    dominant: str | None = None
+    for pollutant in POLLUTANTS:
+        value = iaqi.get(pollutant)
+        if not isinstance(value, (int, float)):
+            continue
+        if scale == SCALE_US_EPA:
+            index: float | None = float(value)
+        else:
+            concentration = concentration_from_epa(pollutant, value)
+            index = sub_index(scale, pollutant, concentration)
+        if index is not None and (best is None or index > best):
+            best, dominant = index, pollutant
+
+    if best is None:
+        return None, None
+    return round(best), dominant
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+import time
+from typing import Any
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into one upstream request.
+
+    Callers asking for a key that is already in flight await the same
+    future. The result is then served to later callers for ``ttl`` seconds.
+    When the caller that sent the request is cancelled, a waiting caller
+    sends it again instead of failing.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize the coalescing layer."""
+        self.ttl = ttl
+        self._pending: dict[Hashable, asyncio.Future[Any]] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result for key, calling factory only when needed."""
+        cached = self._results.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        while (pending := self._pending.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only the leader was cancelled: take over its request.
+                task = asyncio.current_task()
+                if not pending.cancelled() or (task and task.cancelling()):
+                    raise
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on the shared future; avoid "never retrieved".
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending[key] = future
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            raise
+        finally:
+            del self._pending[key]
+
+        future.set_result(result)
+        self._store(key, result)
+        return result
+
+    def _store(self, key: Hashable, result: Any) -> None:
+        now = time.monotonic()
+        expired = [k for k, (expires, _) in self._results.items() if expires <= now]
+        for k in expired:
+            del self._results[k]
+        self._results[key] = (now + self.ttl, result)
+
+
+class LRUCache:
+    """Bounded mapping that expires entries after ``ttl`` seconds.
+
+    When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Initialize the cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value of key, marking it as recently used."""
+        if (item := self._data.get(key)) is None:
+            return default
+        if item[0] <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
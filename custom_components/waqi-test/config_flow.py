@@ -1,32 +1,96 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
+import hashlib
+from typing import Any
+
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 import waqi_client_async as waqi
 
 from .const import (
     CONF_API_TOKEN,
+    CONF_AQI_SCALE,
+    CONF_BOUNDS_MODE,
+    CONF_DAILY_BUDGET,
+    CONF_KEEP_RAW,
     CONF_KEYWORD,
+    CONF_NEIGHBORS,
+    CONF_RATE_LIMIT,
     CONF_STATION,
     CONF_UPDATE_INTERVAL,
+    DEFAULT_DAILY_BUDGET,
+    DEFAULT_NEIGHBORS,
+    DEFAULT_RATE_LIMIT,
     DEFAULT_UPDATE_INTERVAL,
+    DATA_FLOW_CACHE,
     DOMAIN,
+    FLOW_CACHE_SIZE,
+    FLOW_CACHE_TTL,
+    HOME_UNIQUE_ID,
     LOGGER,
+    NEAREST_COUNT,
+    SEARCH_LIMIT,
+    SEARCH_MIN_SCORE,
+    WORLD_BOUNDS,
 )
+from .aqi import SCALE_US_EPA, SCALES
+from .cache import LRUCache
+from .coordinator import async_get_hub, async_release_hub
+from .stations import Station
+from .store import async_get_station_catalog
+from .throttle import BudgetExhausted, CircuitOpen
 
 FLOW_FEED = "Enter the station ID"
+FLOW_HOME = "Interpolate air quality at home"
+FLOW_NEAREST = "Pick a station near home"
 FLOW_SEARCH = "Find stations from an area/city name"
 FLOW_TYPE = "flow_type"
 
 CONFIG_SCHEMA = vol.Schema(
-    {vol.Required(FLOW_TYPE, default=FLOW_SEARCH): vol.In([FLOW_SEARCH, FLOW_FEED])}
+    {
+        vol.Required(FLOW_TYPE, default=FLOW_SEARCH): vol.In(
+            [FLOW_SEARCH, FLOW_NEAREST, FLOW_FEED, FLOW_HOME]
+        )
+    }
 )
 
+_MISSING = object()
+
+
+async def async_hub_request(
+    hass: HomeAssistant, token: str, method: str, arg: Any
+) -> Any:
+    """Call a hub method with a token typed into a config flow."""
+    hub = async_get_hub(hass, token)
+    # A token rejected earlier may have been fixed on the WAQI side since.
+    hub.breaker.reset_invalid_token()
+    try:
+        return await getattr(hub, method)(arg)
+    finally:
+        # Tokens only typed into a flow do not keep a hub around.
+        async_release_hub(hass, hub)
+
+
+async def async_cached_request(
+    hass: HomeAssistant, token: str, method: str, arg: str
+) -> Any:
+    """Call a hub method, reusing responses from earlier config flows."""
+    cache: LRUCache = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_FLOW_CACHE, LRUCache(FLOW_CACHE_SIZE, FLOW_CACHE_TTL)
+    )
+    key = (hashlib.sha256(token.encode()).hexdigest(), method, arg)
+    if (cached := cache.get(key, _MISSING)) is not _MISSING:
+        return cached
+
+    result = await async_hub_request(hass, token, method, arg)
+    cache.set(key, result)
+    return result
+
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow."""
@@ -34,6 +98,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     _api_token: str
+    _reauth_entry: config_entries.ConfigEntry
+    _distances: dict[str, float] = {}
     _stations: dict[str, str]
     _update_interval: int
 
@@ -46,9 +112,15 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if user_input[FLOW_TYPE] == FLOW_SEARCH:
                 return await self.async_step_user_search()
 
+            if user_input[FLOW_TYPE] == FLOW_NEAREST:
+                return await self.async_step_user_nearest()
+
             if user_input[FLOW_TYPE] == FLOW_FEED:
                 return await self.async_step_user_feed()
 
+            if user_input[FLOW_TYPE] == FLOW_HOME:
+                return await self.async_step_user_home()
+
         return self.async_show_form(
             step_id="user",
             data_schema=CONFIG_SCHEMA,
@@ -77,20 +149,51 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors=errors,
             )
 
+        # The live search is only a fallback for names the catalogue misses.
+        # A partial catalogue, filled by earlier searches, cannot tell that
+        # a name is missing, so a stale one is downloaded in full first.
+        catalog = await async_get_station_catalog(self.hass)
+        matches: list[Station] = []
+        checked = False
         try:
-            client = waqi.WAQIClient(
-                user_input[CONF_API_TOKEN], async_get_clientsession(self.hass)
-            )
-            found = await client.search(user_input[CONF_KEYWORD])
-            LOGGER.debug("Found: %s", found)
-            if not found:
-                errors[CONF_KEYWORD] = "no_matching_stations_found"
-        except waqi.OverQuota:
+            if catalog.is_stale:
+                stations = await async_hub_request(
+                    self.hass, user_input[CONF_API_TOKEN], "async_bounds", WORLD_BOUNDS
+                )
+                catalog.async_update(map(Station.from_bounds, stations), complete=True)
+                checked = True
+            if not catalog.is_stale:
+                name_index = await catalog.async_get_name_index()
+                matches = name_index.search(
+                    user_input[CONF_KEYWORD], SEARCH_LIMIT, SEARCH_MIN_SCORE
+                )
+
+            if matches:
+                LOGGER.debug("Found in catalogue: %s", matches)
+                if not checked:
+                    # The catalogue does not need the token, check it anyway.
+                    await async_cached_request(
+                        self.hass,
+                        user_input[CONF_API_TOKEN],
+                        "async_feed",
+                        matches[0].station_id,
+                    )
+            else:
+                found = await async_cached_request(
+                    self.hass,
+                    user_input[CONF_API_TOKEN],
+                    "async_search",
+                    user_input[CONF_KEYWORD],
+                )
+                LOGGER.debug("Found: %s", found)
+                if not found:
+                    errors[CONF_KEYWORD] = "no_matching_stations_found"
+        except (waqi.OverQuota, BudgetExhausted, CircuitOpen):
             errors[CONF_API_TOKEN] = "api_over_quota"
         except waqi.InvalidToken:
             errors[CONF_API_TOKEN] = "api_token_invalid"
         except Exception:
-            errors[CONF_BASE] = "unknown"
+            errors["base"] = "unknown"
 
         if errors:
             LOGGER.debug("Errors: %s", errors)
@@ -115,18 +218,109 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors=errors,
             )
 
-        self._stations = {}
-        for station in found:
-            LOGGER.debug("Station found: %s", station)
-            temp_id = station["uid"]
-            station_id = f"@{temp_id}"
-            self._stations[station_id] = station["station"]["name"]
+        if matches:
+            self._stations = {station.station_id: station.name for station in matches}
+        else:
+            catalog.async_update(filter(None, map(Station.from_search, found)))
+
+            self._stations = {}
+            for station in found:
+                LOGGER.debug("Station found: %s", station)
+                temp_id = station["uid"]
+                station_id = f"@{temp_id}"
+                self._stations[station_id] = station["station"]["name"]
 
         self._api_token = user_input[CONF_API_TOKEN]
         self._update_interval = user_input[CONF_UPDATE_INTERVAL]
 
         return await self.async_step_pick_station()
 
+    async def async_step_user_nearest(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle picking from the stations closest to the home location."""
+        errors: dict[str, str] = {}
+
+        if user_input:
+            catalog = await async_get_station_catalog(self.hass)
+            checked = False
+            try:
+                if catalog.is_stale:
+                    found = await async_hub_request(
+                        self.hass,
+                        user_input[CONF_API_TOKEN],
+                        "async_bounds",
+                        WORLD_BOUNDS,
+                    )
+                    catalog.async_update(map(Station.from_bounds, found), complete=True)
+                    checked = True
+            except waqi.InvalidToken:
+                errors[CONF_API_TOKEN] = "api_token_invalid"
+            # A stale catalogue is still good enough when the refresh failed.
+            except (waqi.OverQuota, BudgetExhausted, CircuitOpen):
+                if not len(catalog):
+                    errors[CONF_API_TOKEN] = "api_over_quota"
+            except Exception:
+                if not len(catalog):
+                    errors["base"] = "unknown"
+
+            if not errors and not len(catalog):
+                errors["base"] = "no_matching_stations_found"
+
+            if not errors:
+                index = await catalog.async_get_index()
+                nearest = index.nearest(
+                    self.hass.config.latitude,
+                    self.hass.config.longitude,
+                    NEAREST_COUNT,
+                )
+
+            if not errors and not checked:
+                # The catalogue does not need the token, check it anyway.
+                try:
+                    await async_cached_request(
+                        self.hass,
+                        user_input[CONF_API_TOKEN],
+                        "async_feed",
+                        nearest[0][1].station_id,
+                    )
+                except (waqi.OverQuota, BudgetExhausted, CircuitOpen):
+                    errors[CONF_API_TOKEN] = "api_over_quota"
+                except waqi.InvalidToken:
+                    errors[CONF_API_TOKEN] = "api_token_invalid"
+                except Exception:
+                    errors["base"] = "unknown"
+
+            if not errors:
+                self._stations = {
+                    station.station_id: station.name for _, station in nearest
+                }
+                self._distances = {
+                    station.station_id: distance for distance, station in nearest
+                }
+                self._api_token = user_input[CONF_API_TOKEN]
+                self._update_interval = user_input[CONF_UPDATE_INTERVAL]
+                return await self.async_step_pick_station()
+
+        return self.async_show_form(
+            step_id="user_nearest",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_API_TOKEN,
+                        default=(user_input or {}).get(CONF_API_TOKEN, vol.UNDEFINED),
+                    ): str,
+                    vol.Optional(
+                        CONF_UPDATE_INTERVAL,
+                        default=(user_input or {}).get(
+                            CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+                        ),
+                    ): int,
+                }
+            ),
+            errors=errors,
+        )
+
     async def async_step_pick_station(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -153,7 +347,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="pick_station",
             data_schema=vol.Schema(
-                {vol.Required(CONF_STATION): vol.In(self._stations)}
+                {
+                    vol.Required(CONF_STATION): vol.In(
+                        {
+                            station_id: f"{name} ({self._distances[station_id]:.1f} km)"
+                            if station_id in self._distances
+                            else name
+                            for station_id, name in self._stations.items()
+                        }
+                    )
+                }
             ),
             errors=errors,
         )
@@ -181,14 +384,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         try:
-            client = waqi.WAQIClient(
-                user_input[CONF_API_TOKEN], async_get_clientsession(self.hass)
+            station = await async_cached_request(
+                self.hass,
+                user_input[CONF_API_TOKEN],
+                "async_feed",
+                user_input[CONF_STATION],
             )
-            station = await client.feed(user_input[CONF_STATION])
             LOGGER.debug("Station: %s", station)
             if not station:
                 errors[CONF_STATION] = "no_station_feed_found"
-        except waqi.OverQuota:
+        except (waqi.OverQuota, BudgetExhausted, CircuitOpen):
             errors[CONF_API_TOKEN] = "api_over_quota"
         except waqi.InvalidToken:
             errors[CONF_API_TOKEN] = "api_token_invalid"
@@ -233,6 +438,74 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
+    async def async_step_user_home(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the interpolated home sensors step."""
+        await self.async_set_unique_id(HOME_UNIQUE_ID)
+        self._abort_if_unique_id_configured()
+
+        if user_input is not None:
+            return self.async_create_entry(title="Home", data={}, options=user_input)
+
+        return self.async_show_form(
+            step_id="user_home",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(CONF_NEIGHBORS, default=DEFAULT_NEIGHBORS): vol.All(
+                        int, vol.Range(min=1)
+                    ),
+                }
+            ),
+        )
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle a token rejected at runtime."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for a new API token."""
+        errors: dict[str, str] = {}
+        entry = self._reauth_entry
+
+        if user_input is not None:
+            try:
+                await async_cached_request(
+                    self.hass,
+                    user_input[CONF_API_TOKEN],
+                    "async_feed",
+                    f"{entry.unique_id}",
+                )
+            except (waqi.OverQuota, BudgetExhausted, CircuitOpen):
+                errors[CONF_API_TOKEN] = "api_over_quota"
+            except waqi.InvalidToken:
+                errors[CONF_API_TOKEN] = "api_token_invalid"
+            except Exception:
+                errors["base"] = "unknown"
+
+            if not errors:
+                same_token = user_input[CONF_API_TOKEN] == entry.options[CONF_API_TOKEN]
+                options = {**entry.options, CONF_API_TOKEN: user_input[CONF_API_TOKEN]}
+                self.hass.config_entries.async_update_entry(entry, options=options)
+                # A loaded entry picks a new token up through its update
+                # listener; the same token leaves the options unchanged.
+                loaded = entry.state is config_entries.ConfigEntryState.LOADED
+                if same_token or not loaded:
+                    await self.hass.config_entries.async_reload(entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_API_TOKEN): str}),
+            description_placeholders={"name": entry.title},
+            errors=errors,
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> OptionsFlow:
@@ -257,6 +530,20 @@ class OptionsFlow(config_entries.OptionsFlow):
             return self.async_create_entry(title="", data=user_input)
 
         options = self._config_entry.options
+        if self._config_entry.unique_id == HOME_UNIQUE_ID:
+            return self.async_show_form(
+                step_id="init",
+                data_schema=vol.Schema(
+                    {
+                        vol.Optional(
+                            CONF_NEIGHBORS,
+                            default=options.get(CONF_NEIGHBORS, DEFAULT_NEIGHBORS),
+                        ): vol.All(int, vol.Range(min=1)),
+                    }
+                ),
+                errors=errors,
+            )
+
         options_schema = vol.Schema(
             {
                 vol.Required(CONF_API_TOKEN): str,
@@ -266,6 +553,26 @@ class OptionsFlow(config_entries.OptionsFlow):
                         CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
                     ),
                 ): int,
+                vol.Optional(
+                    CONF_BOUNDS_MODE,
+                    default=options.get(CONF_BOUNDS_MODE, False),
+                ): bool,
+                vol.Optional(
+                    CONF_RATE_LIMIT,
+                    default=options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.01)),
+                vol.Optional(
+                    CONF_DAILY_BUDGET,
+                    default=options.get(CONF_DAILY_BUDGET, DEFAULT_DAILY_BUDGET),
+                ): vol.All(int, vol.Range(min=1)),
+                vol.Optional(
+                    CONF_AQI_SCALE,
+                    default=options.get(CONF_AQI_SCALE, SCALE_US_EPA),
+                ): vol.In(SCALES),
+                vol.Optional(
+                    CONF_KEEP_RAW,
+                    default=options.get(CONF_KEEP_RAW, False),
+                ): bool,
             }
         )
 
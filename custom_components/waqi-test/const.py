@@ -5,8 +5,68 @@ LOGGER: Logger = getLogger(__package__)
 DOMAIN = "waqi-test"
 
 CONF_API_TOKEN = "api_token"
+CONF_AQI_SCALE = "aqi_scale"
+CONF_BOUNDS_MODE = "bounds_mode"
+CONF_DAILY_BUDGET = "daily_budget"
+CONF_KEEP_RAW = "keep_raw"
 CONF_KEYWORD = "keyword"
+CONF_RATE_LIMIT = "rate_limit"
 CONF_STATION = "station"
 CONF_UPDATE_INTERVAL = "update_interval"
 
+DEFAULT_DAILY_BUDGET = 20000
+DEFAULT_RATE_LIMIT = 1.0
 DEFAULT_UPDATE_INTERVAL = 900
+
+# Stations offered by the "nearest to home" flow, which takes them from a
+# catalogue downloaded with a single map/bounds request over the world.
+NEAREST_COUNT = 10
+WORLD_BOUNDS = (-90.0, -180.0, 90.0, 180.0)
+
+# Catalogue matches offered by the search flow before falling back to the API.
+# They are only used from a complete, fresh catalogue and when they contain
+# at least this share of the keyword's trigrams. One typo breaks up to three
+# of them, so half of the six trigrams of a five letter city name survive it.
+SEARCH_LIMIT = 25
+SEARCH_MIN_SCORE = 0.5
+
+# Search and feed validation responses reused across config flows.
+FLOW_CACHE_SIZE = 128
+FLOW_CACHE_TTL = 300
+
+# In bounds mode the AQI comes from map/bounds and the full feed is only
+# fetched this often (seconds); stations are grouped per grid cell (degrees).
+BOUNDS_CELL_SIZE = 1.0
+BOUNDS_PADDING = 0.01
+
+# Over quota suspends a token for BREAKER_BASE_DELAY seconds, doubling up to
+# BREAKER_MAX_DELAY; network errors are retried RETRY_ATTEMPTS times.
+BREAKER_BASE_DELAY = 60
+BREAKER_MAX_DELAY = 6 * 3600
+RETRY_ATTEMPTS = 2
+RETRY_BASE_DELAY = 2
+
+# After a failed refresh, the last good data is served, marked stale, until
+# its observation is this many seconds old.
+STALE_MAX_AGE = 6 * 3600
+
+# Spans (seconds) of the rolling statistics kept for every pollutant.
+ROLLING_WINDOWS = {"1h": 3600, "24h": 24 * 3600, "7d": 7 * 24 * 3600}
+
+# The "home" entry interpolates each value from the closest stations with
+# inverse distance weighting, distances in km raised to IDW_POWER.
+CONF_NEIGHBORS = "neighbors"
+DEFAULT_NEIGHBORS = 4
+HOME_UNIQUE_ID = "home"
+IDW_POWER = 2
+SIGNAL_STATIONS_UPDATED = f"{DOMAIN}_stations_updated"
+
+# Identical feed/search calls finishing within this many seconds are shared.
+COALESCE_TTL = 10
+FEED_INTERVAL = 3600
+
+DATA_FEED_CACHE = "feed_cache"
+DATA_FLOW_CACHE = "flow_cache"
+DATA_HUBS = "hubs"
+DATA_SESSION = "session"
+DATA_STATION_CATALOG = "station_catalog"
@@ -0,0 +1,569 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Mapping
+from datetime import datetime
+from functools import partial
+import hashlib
+import random
+from typing import Any
+
+from aiohttp import ClientError
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+import waqi_client_async as waqi
+
+from .api import async_get_bounds, async_get_feed
+from .aqi import (
+    POLLUTANTS,
+    SCALE_US_EPA,
+    compute_aqi,
+    concentration_from_epa,
+)
+from .cache import SingleFlight
+from .const import (
+    BOUNDS_CELL_SIZE,
+    BOUNDS_PADDING,
+    BREAKER_BASE_DELAY,
+    BREAKER_MAX_DELAY,
+    COALESCE_TTL,
+    CONF_AQI_SCALE,
+    CONF_BOUNDS_MODE,
+    CONF_DAILY_BUDGET,
+    CONF_KEEP_RAW,
+    CONF_RATE_LIMIT,
+    CONF_UPDATE_INTERVAL,
+    DATA_HUBS,
+    DEFAULT_DAILY_BUDGET,
+    DEFAULT_RATE_LIMIT,
+    DOMAIN,
+    FEED_INTERVAL,
+    LOGGER,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    ROLLING_WINDOWS,
+    SIGNAL_STATIONS_UPDATED,
+    STALE_MAX_AGE,
+)
+from .nowcast import NowCast
+from .rolling import RollingWindow
+from .scheduler import (
+    MIN_POLL_DELAY,
+    PUBLISH_MARGIN,
+    PublishCadence,
+    phase_offset,
+    retry_delay,
+)
+from .session import async_get_waqi_session
+from .snapshot import StationSnapshot
+from .store import FeedCache
+from .throttle import CircuitBreaker, RequestThrottle
+
+Bounds = tuple[float, float, float, float]
+
+
+def group_into_bounds(
+    positions: dict[str, tuple[float, float]], cell_size: float = BOUNDS_CELL_SIZE
+) -> list[tuple[Bounds, list[str]]]:
+    """Group station positions into one bounding box per grid cell."""
+    cells: dict[tuple[int, int], list[str]] = {}
+    for station_id, (lat, lng) in positions.items():
+        cells.setdefault((int(lat // cell_size), int(lng // cell_size)), []).append(
+            station_id
+        )
+
+    groups: list[tuple[Bounds, list[str]]] = []
+    for station_ids in cells.values():
+        lats = [positions[station_id][0] for station_id in station_ids]
+        lngs = [positions[station_id][1] for station_id in station_ids]
+        groups.append(
+            (
+                (
+                    min(lats) - BOUNDS_PADDING,
+                    min(lngs) - BOUNDS_PADDING,
+                    max(lats) + BOUNDS_PADDING,
+                    max(lngs) + BOUNDS_PADDING,
+                ),
+                station_ids,
+            )
+        )
+    return groups
+
+
+class WAQIHub:
+    """Polling engine shared by all config entries using the same API token."""
+
+    def __init__(self, hass: HomeAssistant, token: str) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.token = token
+        self.session = async_get_waqi_session(hass)
+        self.client = waqi.WAQIClient(token=token, session=self.session)
+        self.throttle = RequestThrottle(DEFAULT_RATE_LIMIT, DEFAULT_DAILY_BUDGET)
+        self.breaker = CircuitBreaker(BREAKER_BASE_DELAY, BREAKER_MAX_DELAY)
+        self._single_flight = SingleFlight(COALESCE_TTL)
+        # Position, AQI and fetch time (loop time) of every station seen in a
+        # bounds response during the last STALE_MAX_AGE seconds.
+        self.bounds_stations: dict[int, tuple[float, float, int, float]] = {}
+
+        self._coordinators: dict[str, WAQIDataUpdateCoordinator] = {}
+        self._next_refresh: dict[str, float] = {}
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+        self._feed_cache: FeedCache | None = None
+        # Station whose entry hosts the budget sensor of the token.
+        self._budget_owner: str | None = None
+        self._remove_budget_sensor: CALLBACK_TYPE | None = None
+
+    @property
+    def token_id(self) -> str:
+        """Return a stable identifier of the token that does not reveal it."""
+        return hashlib.sha256(self.token.encode()).hexdigest()[:12]
+
+    @property
+    def is_empty(self) -> bool:
+        """Return True when no station is registered anymore."""
+        return not self._coordinators
+
+    async def async_feed(self, station_id: str) -> dict[str, Any]:
+        """Fetch the feed of a single station."""
+        return await self._single_flight.run(
+            ("feed", station_id),
+            partial(
+                self._async_request,
+                partial(async_get_feed, self.session, self.token, station_id),
+            ),
+        )
+
+    async def async_search(self, keyword: str) -> list[dict[str, Any]]:
+        """Search stations by name."""
+        return await self._single_flight.run(
+            ("search", keyword),
+            partial(self._async_request, partial(self.client.search, keyword)),
+        )
+
+    async def async_bounds(self, bounds: Bounds) -> list[dict[str, Any]]:
+        """Fetch all stations in a box with their current AQI."""
+        return await self._async_request(
+            partial(async_get_bounds, self.session, self.token, bounds)
+        )
+
+    async def _async_request(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Send a request through the breaker and throttle.
+
+        Network errors are retried with a jittered exponential delay; being
+        over quota or using an invalid token trips the breaker for every
+        entry of the token.
+        """
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            self.breaker.check()
+            await self.throttle.acquire()
+            if self._feed_cache is not None:
+                self._feed_cache.async_set_budget(
+                    self.token_id, self.throttle.day, self.throttle.used_today
+                )
+            try:
+                result = await request()
+            except waqi.OverQuota:
+                self.breaker.record_over_quota()
+                raise
+            except waqi.InvalidToken:
+                self.breaker.record_invalid_token()
+                raise
+            except (ClientError, asyncio.TimeoutError) as err:
+                if attempt == RETRY_ATTEMPTS:
+                    raise
+                delay = RETRY_BASE_DELAY * 2**attempt * random.uniform(0.5, 1.5)
+                LOGGER.debug("Request failed (%s), retrying in %.1f s", err, delay)
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    @callback
+    def async_add_coordinator(self, coordinator: WAQIDataUpdateCoordinator) -> None:
+        """Register a station and schedule its first refresh in its own phase."""
+        if self._feed_cache is None:
+            self._feed_cache = coordinator.feed_cache
+            if (budget := self._feed_cache.get_budget(self.token_id)) is not None:
+                self.throttle.restore(*budget)
+        self._coordinators[coordinator.station_id] = coordinator
+        self._next_refresh[coordinator.station_id] = self.hass.loop.time() + (
+            phase_offset(coordinator.station_id, coordinator.poll_interval)
+            or coordinator.poll_interval
+        )
+        self._async_update_limits()
+        self._async_schedule()
+        self.async_assign_budget_sensor()
+
+    @callback
+    def async_update_coordinator(self, coordinator: WAQIDataUpdateCoordinator) -> None:
+        """Apply changed options of a registered station to the schedule."""
+        self._next_refresh[coordinator.station_id] = min(
+            self._next_refresh[coordinator.station_id],
+            self.hass.loop.time() + coordinator.poll_interval,
+        )
+        self._async_update_limits()
+        self._async_schedule()
+
+    @callback
+    def async_remove_coordinator(self, coordinator: WAQIDataUpdateCoordinator) -> None:
+        """Unregister a station, stopping the engine when it was the last one."""
+        self._coordinators.pop(coordinator.station_id, None)
+        self._next_refresh.pop(coordinator.station_id, None)
+        self._async_update_limits()
+        self._async_schedule()
+        if coordinator.station_id == self._budget_owner:
+            if self._remove_budget_sensor is not None:
+                self._remove_budget_sensor()
+            self._budget_owner = self._remove_budget_sensor = None
+            self.async_assign_budget_sensor()
+
+    @callback
+    def async_assign_budget_sensor(self) -> None:
+        """Host the budget sensor of the token on one of its entries."""
+        if self._budget_owner is not None:
+            return
+        for station_id, coordinator in self._coordinators.items():
+            if coordinator.async_add_budget_sensor is not None:
+                self._budget_owner = station_id
+                self._remove_budget_sensor = coordinator.async_add_budget_sensor(self)
+                return
+
+    @callback
+    def _async_update_limits(self) -> None:
+        """Apply the most restrictive limits configured on any entry."""
+        if self._coordinators:
+            self.throttle.configure(
+                min(c.rate_limit for c in self._coordinators.values()),
+                min(c.daily_budget for c in self._coordinators.values()),
+            )
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Arm the single timer for the earliest due station."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+        if not self._next_refresh:
+            return
+
+        delay = max(0.0, min(self._next_refresh.values()) - self.hass.loop.time())
+        self._unsub_refresh = async_call_later(
+            self.hass, delay, self._async_refresh_due
+        )
+
+    async def _async_refresh_due(self, _now: Any) -> None:
+        """Refresh every station whose interval has elapsed."""
+        self._unsub_refresh = None
+        now = self.hass.loop.time()
+
+        due = [
+            coordinator
+            for station_id, coordinator in self._coordinators.items()
+            if self._next_refresh[station_id] <= now
+        ]
+        # Nothing can be fetched before the breaker closes again.
+        if self.breaker.is_open:
+            for coordinator in due:
+                self._next_refresh[coordinator.station_id] = now + max(
+                    self.breaker.remaining, MIN_POLL_DELAY
+                )
+            self._async_schedule()
+            return
+
+        # Provisional slot so a slow refresh is not picked up twice.
+        for coordinator in due:
+            self._next_refresh[coordinator.station_id] = now + coordinator.poll_interval
+
+        self._async_schedule()
+
+        aqi_only = {
+            coordinator.station_id: coordinator.position
+            for coordinator in due
+            if coordinator.bounds_mode
+            and coordinator.position is not None
+            and coordinator.next_feed > now
+        }
+        full = [
+            coordinator for coordinator in due if coordinator.station_id not in aqi_only
+        ]
+
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in full),
+            *(
+                self._async_refresh_bounds(bounds, station_ids)
+                for bounds, station_ids in group_into_bounds(aqi_only)
+            ),
+        )
+
+        utcnow = dt_util.utcnow()
+        now = self.hass.loop.time()
+        for coordinator in due:
+            if coordinator.station_id not in self._next_refresh:
+                continue
+            delay = coordinator.cadence.next_delay(utcnow)
+            if coordinator.failures:
+                delay = min(
+                    delay, retry_delay(coordinator.failures, coordinator.poll_interval)
+                )
+            self._next_refresh[coordinator.station_id] = now + delay
+        self._async_schedule()
+        async_dispatcher_send(self.hass, SIGNAL_STATIONS_UPDATED)
+
+    async def _async_refresh_bounds(
+        self, bounds: Bounds, station_ids: list[str]
+    ) -> None:
+        """Update the AQI of a group of stations from a single bounds request."""
+        coordinators = [self._coordinators[station_id] for station_id in station_ids]
+        try:
+            stations = await self.async_bounds(bounds)
+        except Exception as err:
+            for coordinator in coordinators:
+                coordinator.async_set_update_error(UpdateFailed(err))
+            return
+
+        now = self.hass.loop.time()
+        found: dict[int, int] = {}
+        for station in stations:
+            if station["aqi"] == "-":
+                continue
+            found[station["uid"]] = int(station["aqi"])
+            self.bounds_stations[station["uid"]] = (
+                station["lat"],
+                station["lon"],
+                found[station["uid"]],
+                now,
+            )
+        for uid, (*_, fetched) in list(self.bounds_stations.items()):
+            if now - fetched > STALE_MAX_AGE:
+                del self.bounds_stations[uid]
+
+        for coordinator in coordinators:
+            if (aqi := found.get(coordinator.data.idx)) is not None:
+                coordinator.async_set_updated_data(coordinator.data.with_aqi(aqi))
+
+
+class WAQIDataUpdateCoordinator(DataUpdateCoordinator[StationSnapshot]):
+    """Per-station view over the shared hub; it has no timer of its own."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        hub: WAQIHub,
+        entry: ConfigEntry,
+        feed_cache: FeedCache,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"WAQI {entry.unique_id}",
+            update_interval=None,
+        )
+        self.hub = hub
+        self.feed_cache = feed_cache
+        self.station_id = f"{entry.unique_id}"
+        # Stations publishing at the same time would converge on the same
+        # poll; their phase within the margin keeps them apart.
+        self.cadence = PublishCadence(
+            entry.options[CONF_UPDATE_INTERVAL],
+            phase_offset(self.station_id, PUBLISH_MARGIN),
+        )
+        self.aqi_scale = SCALE_US_EPA
+        self.nowcast = {"pm25": NowCast(), "pm10": NowCast()}
+        self.rolling = {
+            key: {
+                window: RollingWindow(span) for window, span in ROLLING_WINDOWS.items()
+            }
+            for key in POLLUTANTS
+        }
+        self.async_apply_options(entry.options)
+        self.next_feed = 0.0
+        self.last_fetched: datetime | None = None
+        self.failures = 0
+        self._notified_key: Hashable = None
+        self._unsub_stale: CALLBACK_TYPE | None = None
+        # Set by the sensor platform; the hub calls it on one entry per token.
+        self.async_add_budget_sensor: Callable[[WAQIHub], CALLBACK_TYPE] | None = None
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the entry options to the running coordinator."""
+        self.poll_interval: int = options[CONF_UPDATE_INTERVAL]
+        self.bounds_mode: bool = options.get(CONF_BOUNDS_MODE, False)
+        self.keep_raw: bool = options.get(CONF_KEEP_RAW, False)
+        self.rate_limit: float = options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT)
+        self.daily_budget: int = options.get(CONF_DAILY_BUDGET, DEFAULT_DAILY_BUDGET)
+        self.cadence.max_delay = self.poll_interval
+
+        scale = options.get(CONF_AQI_SCALE, SCALE_US_EPA)
+        rescale = self.data is not None and scale != self.aqi_scale
+        self.aqi_scale = scale
+        if rescale:
+            self._add_local_aqi(self.data)
+            self._notified_key = None
+            self.async_update_listeners()
+
+    def _add_local_aqi(self, snapshot: StationSnapshot) -> None:
+        """Add the composite index on the configured scale to the values."""
+        index, dominant = compute_aqi(snapshot.values, self.aqi_scale)
+        if index is None:
+            # A rescaled snapshot must not keep the index of the old scale.
+            snapshot.values.pop("local_aqi", None)
+            snapshot.values.pop("dominant_pollutant", None)
+        else:
+            snapshot.values["local_aqi"] = index
+            snapshot.values["dominant_pollutant"] = dominant
+
+    def _add_nowcast(self, snapshot: StationSnapshot) -> None:
+        """Feed the hourly PM readings to their NowCast and add the results."""
+        for key, nowcast in self.nowcast.items():
+            value = snapshot.values.get(key)
+            if snapshot.observed is not None and isinstance(value, (int, float)):
+                nowcast.add(snapshot.observed, concentration_from_epa(key, value))
+            if (concentration := nowcast.value) is not None:
+                snapshot.values[f"{key}_nowcast"] = concentration
+
+    def _add_rolling_stats(self, snapshot: StationSnapshot) -> None:
+        """Feed the pollutant readings to their windows and add the aggregates."""
+        if snapshot.observed is None:
+            return
+        timestamp = snapshot.observed.timestamp()
+        for key, windows in self.rolling.items():
+            value = snapshot.values.get(key)
+            if not isinstance(value, (int, float)):
+                continue
+            for window, rolling in windows.items():
+                rolling.add(timestamp, value)
+                snapshot.values[f"{key}_{window}_mean"] = rolling.mean
+                snapshot.values[f"{key}_{window}_max"] = rolling.max
+                snapshot.values[f"{key}_{window}_p95"] = rolling.p95
+
+    @callback
+    def async_restore(self, snapshot: StationSnapshot) -> None:
+        """Serve a stored snapshot as stale data until a live refresh succeeds."""
+        self.data = snapshot
+        self.last_update_success = False
+        self.async_update_listeners()
+
+    @property
+    def values(self) -> dict[str, StateType]:
+        """Return the sensor values of the last snapshot."""
+        return self.data.values if self.data else {}
+
+    @property
+    def data_age(self) -> float | None:
+        """Return the age of the last observation in seconds."""
+        if not self.data or self.data.observed is None:
+            return None
+        return (dt_util.utcnow() - self.data.observed).total_seconds()
+
+    @property
+    def is_stale(self) -> bool:
+        """Return True when the data is restored or kept from a failed refresh."""
+        return self.data is not None and not self.last_update_success
+
+    @property
+    def has_usable_data(self) -> bool:
+        """Return True while the last good data may still be served."""
+        if self.data is None:
+            return False
+        if self.last_update_success:
+            return True
+        age = self.data_age
+        return age is not None and age < STALE_MAX_AGE
+
+    @property
+    def position(self) -> tuple[float, float] | None:
+        """Return the station coordinates reported by the last feed."""
+        return self.data.position if self.data else None
+
+    async def _async_update_data(self) -> StationSnapshot:
+        """Fetch the full station feed through the hub."""
+        self.failures += 1
+        try:
+            data = await self.hub.async_feed(self.station_id)
+        except waqi.InvalidToken as err:
+            raise ConfigEntryAuthFailed(err) from err
+        except Exception as err:
+            raise UpdateFailed(err) from err
+        if data is None:
+            raise UpdateFailed(f"Unknown station {self.station_id}")
+        self.failures = 0
+        snapshot = StationSnapshot.from_feed(data, self.keep_raw)
+        self._add_local_aqi(snapshot)
+        self._add_nowcast(snapshot)
+        self._add_rolling_stats(snapshot)
+        self.next_feed = self.hass.loop.time() + max(self.poll_interval, FEED_INTERVAL)
+        self.last_fetched = dt_util.utcnow()
+        self.cadence.record(snapshot.observed, self.last_fetched)
+        if snapshot.key != self._notified_key:
+            self.feed_cache.async_set(self.station_id, snapshot)
+        return snapshot
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners only when the station published a new observation."""
+        if not self.last_update_success:
+            self._notified_key = None
+            self._async_schedule_stale()
+        else:
+            self.async_cancel_stale()
+            key = self.data.key if self.data else None
+            if key is not None and key == self._notified_key:
+                return
+            self._notified_key = key
+        super().async_update_listeners()
+
+    @callback
+    def _async_schedule_stale(self) -> None:
+        """Notify listeners again once the kept data is too old to serve.
+
+        Repeated failures do not notify listeners, so without this the
+        sensors would stay available on stale data for the whole outage.
+        """
+        if self._unsub_stale is not None or (age := self.data_age) is None:
+            return
+        if age < STALE_MAX_AGE:
+            self._unsub_stale = async_call_later(
+                self.hass, STALE_MAX_AGE - age, self._async_stale
+            )
+
+    @callback
+    def _async_stale(self, _now: Any) -> None:
+        self._unsub_stale = None
+        self.async_update_listeners()
+
+    @callback
+    def async_cancel_stale(self) -> None:
+        """Cancel the pending stale data notification."""
+        if self._unsub_stale is not None:
+            self._unsub_stale()
+            self._unsub_stale = None
+
+
+@callback
+def async_get_hub(hass: HomeAssistant, token: str) -> WAQIHub:
+    """Return the hub for an API token, creating it when needed."""
+    hubs: dict[str, WAQIHub] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_HUBS, {}
+    )
+    if token not in hubs:
+        hubs[token] = WAQIHub(hass, token)
+    return hubs[token]
+
+
+@callback
+def async_release_hub(hass: HomeAssistant, hub: WAQIHub) -> None:
+    """Drop the hub once its last station has been removed."""
+    if hub.is_empty:
+        hass.data[DOMAIN][DATA_HUBS].pop(hub.token, None)
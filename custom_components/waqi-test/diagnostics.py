@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_TOKEN, DOMAIN, HOME_UNIQUE_ID
+
+TO_REDACT = {CONF_API_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    if entry.unique_id == HOME_UNIQUE_ID:
+        return {"options": dict(entry.options), "values": coordinator.data}
+
+    snapshot = coordinator.data
+
+    return {
+        "options": async_redact_data(entry.options, TO_REDACT),
+        "snapshot": snapshot.as_dict() if snapshot else None,
+        "raw": snapshot.raw if snapshot else None,
+    }
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+import csv
+from datetime import datetime
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER
+from .sensor import SENSOR_DESCRIPTIONS
+
+# Hourly rows handed to the recorder per import call.
+BATCH_SIZE = 5000
+
+Observation = tuple[datetime, dict[str, float]]
+
+
+def read_history_csv(path: str) -> list[Observation]:
+    """Read a WAQI historical data export (date, pm25, pm10, ... columns).
+
+    Cells that are not numbers are skipped. This does blocking I/O and must
+    run in the executor.
+    """
+    keys = {description.key for description in SENSOR_DESCRIPTIONS}
+    observations: list[Observation] = []
+    with open(path, encoding="utf-8", newline="") as file:
+        reader = csv.DictReader(file, skipinitialspace=True)
+        for row in reader:
+            if (moment := parse_history_date(row.pop("date", ""))) is None:
+                continue
+            values = {}
+            for key, value in row.items():
+                if key not in keys or not value or not value.strip():
+                    continue
+                try:
+                    values[key] = float(value)
+                except ValueError:
+                    LOGGER.debug(
+                        "Skipping %s=%r on line %s of %s",
+                        key,
+                        value,
+                        reader.line_num,
+                        path,
+                    )
+            observations.append((moment, values))
+    return observations
+
+
+def parse_history_date(value: str) -> datetime | None:
+    """Parse the date column of a history export as local midnight."""
+    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y-%m-%d %H:%M"):
+        try:
+            parsed = datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+        return parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return None
+
+
+def hourly_statistics(
+    observations: Iterable[Observation],
+) -> dict[str, list[StatisticData]]:
+    """Aggregate observations into hourly mean/min/max rows per sensor key."""
+    buckets: dict[str, dict[datetime, list[float]]] = {}
+    for moment, values in observations:
+        start = dt_util.as_utc(moment).replace(minute=0, second=0, microsecond=0)
+        for key, value in values.items():
+            buckets.setdefault(key, {}).setdefault(start, []).append(value)
+
+    return {
+        key: [
+            StatisticData(
+                start=start,
+                mean=sum(values) / len(values),
+                min=min(values),
+                max=max(values),
+            )
+            for start, values in sorted(hours.items())
+        ]
+        for key, hours in buckets.items()
+    }
+
+
+@callback
+def async_backfill_statistics(
+    hass: HomeAssistant, entry: ConfigEntry, observations: Iterable[Observation]
+) -> int:
+    """Queue bulk imports of the observations into the sensors' statistics.
+
+    Returns the number of hourly rows queued.
+    """
+    registry = er.async_get(hass)
+    hourly = hourly_statistics(observations)
+    rows = 0
+
+    for description in SENSOR_DESCRIPTIONS:
+        # Sensors without a state class have no long-term statistics.
+        if description.state_class is None:
+            continue
+        statistics = hourly.get(description.key)
+        if not statistics:
+            continue
+
+        unique_id = f"{DOMAIN}-{entry.unique_id}-{description.key}".lower()
+        entity_id = registry.async_get_entity_id(Platform.SENSOR, DOMAIN, unique_id)
+        if entity_id is None:
+            LOGGER.debug("No %s sensor for %s, skipping", description.key, entry.title)
+            continue
+
+        metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=None,
+            source="recorder",
+            statistic_id=entity_id,
+            unit_of_measurement=description.native_unit_of_measurement,
+        )
+        for index in range(0, len(statistics), BATCH_SIZE):
+            async_import_statistics(
+                hass, metadata, statistics[index : index + BATCH_SIZE]
+            )
+        rows += len(statistics)
+
+    return rows
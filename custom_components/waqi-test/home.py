@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .aqi import POLLUTANTS
+from .const import (
+    CONF_NEIGHBORS,
+    DATA_HUBS,
+    DEFAULT_NEIGHBORS,
+    DOMAIN,
+    IDW_POWER,
+    LOGGER,
+    STALE_MAX_AGE,
+)
+from .coordinator import WAQIDataUpdateCoordinator
+from .interpolation import Source, idw
+
+# Values interpolated at the home location.
+HOME_KEYS = ("aqi", *POLLUTANTS)
+
+
+class HomeCoordinator(DataUpdateCoordinator[dict[str, StateType]]):
+    """Air quality at the home location, interpolated from the known stations.
+
+    It never calls the API: the sources are the snapshots of the configured
+    stations and the AQI of the stations found by bounds requests. The hubs
+    signal the end of each refresh cycle to trigger a new interpolation.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, LOGGER, name="WAQI home", update_interval=None)
+        self.async_apply_options(entry.options)
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the entry options."""
+        self.neighbors: int = options.get(CONF_NEIGHBORS, DEFAULT_NEIGHBORS)
+
+    def _sources(self) -> list[Source]:
+        """Return the position and values of every station with usable data."""
+        # The home entry can be set up before any station entry.
+        domain_data = self.hass.data.get(DOMAIN, {})
+        now = self.hass.loop.time()
+        sources: dict[int | str, Source] = {}
+        for hub in domain_data.get(DATA_HUBS, {}).values():
+            for uid, (lat, lon, aqi, fetched) in hub.bounds_stations.items():
+                if now - fetched <= STALE_MAX_AGE:
+                    sources[uid] = ((lat, lon), {"aqi": aqi})
+
+        # Full snapshots replace the bounds AQI of the same station.
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if (entry_data := domain_data.get(entry.entry_id)) is None:
+                continue
+            coordinator = entry_data["coordinator"]
+            if (
+                isinstance(coordinator, WAQIDataUpdateCoordinator)
+                and coordinator.has_usable_data
+                and coordinator.position is not None
+            ):
+                sources[coordinator.data.idx or coordinator.station_id] = (
+                    coordinator.position,
+                    coordinator.values,
+                )
+        return list(sources.values())
+
+    @callback
+    def async_interpolate(self) -> None:
+        """Interpolate again, notifying listeners only when the result changed.
+
+        The hub signals after every refresh cycle, most of which bring no new
+        observation near home.
+        """
+        if (data := self._interpolate()) != self.data:
+            self.async_set_updated_data(data)
+
+    def _interpolate(self) -> dict[str, StateType]:
+        return idw(
+            (self.hass.config.latitude, self.hass.config.longitude),
+            self._sources(),
+            HOME_KEYS,
+            self.neighbors,
+            IDW_POWER,
+        )
+
+    async def _async_update_data(self) -> dict[str, StateType]:
+        """Interpolate from the data already fetched by the stations."""
+        return self._interpolate()
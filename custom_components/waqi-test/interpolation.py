@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from operator import itemgetter
+
+from homeassistant.helpers.typing import StateType
+
+from .stations import distance_km
+
+# Closer than this (km), a station is taken as being at the target.
+MIN_DISTANCE = 0.01
+
+Source = tuple[tuple[float, float], Mapping[str, StateType]]
+
+
+def idw(
+    target: tuple[float, float],
+    sources: Iterable[Source],
+    keys: Iterable[str],
+    count: int,
+    power: float,
+) -> dict[str, float]:
+    """Interpolate values at a target by inverse distance weighting.
+
+    Sources are ranked by distance once; each key is then interpolated from
+    the ``count`` closest sources that report it, with weights 1 / d**power.
+    """
+    ranked = sorted(
+        (
+            (max(MIN_DISTANCE, distance_km(*target, *position)) ** -power, values)
+            for position, values in sources
+        ),
+        key=itemgetter(0),
+        reverse=True,
+    )
+
+    result: dict[str, float] = {}
+    for key in keys:
+        total = weights = 0.0
+        used = 0
+        for weight, values in ranked:
+            if used == count:
+                break
+            value = values.get(key)
+            if not isinstance(value, (int, float)):
+                continue
+            total += weight * value
+            weights += weight
+            used += 1
+        if used:
+            result[key] = round(total / weights, 1)
+    return result
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+
+# NowCast weighs the last 12 hourly concentrations; it needs two of the
+# three most recent hours and never lets the weight drop below MIN_WEIGHT.
+HOURS = 12
+MIN_RECENT = 2
+MIN_WEIGHT = 0.5
+
+
+class NowCast:
+    """US EPA NowCast over a ring buffer of hourly concentrations.
+
+    Slot ``hour % HOURS`` holds the value observed in that epoch hour, so
+    adding an observation is O(1), a newer reading of the same hour replaces
+    the older one and missing hours are simply skipped.
+    """
+
+    __slots__ = ("_values", "_hours", "_latest")
+
+    def __init__(self) -> None:
+        """Initialize an empty buffer."""
+        self._values = array("d", bytes(8 * HOURS))
+        self._hours = array("q", [-1] * HOURS)
+        self._latest = -1
+
+    def add(self, observed: datetime, concentration: float) -> None:
+        """Record the concentration of the hour of an observation."""
+        hour = int(observed.timestamp()) // 3600
+        if hour <= self._latest - HOURS:
+            return
+        slot = hour % HOURS
+        self._values[slot] = concentration
+        self._hours[slot] = hour
+        self._latest = max(self._latest, hour)
+
+    @property
+    def value(self) -> float | None:
+        """Return the NowCast concentration, or None without recent data."""
+        recent: list[tuple[int, float]] = []
+        for age in range(HOURS):
+            hour = self._latest - age
+            if self._hours[hour % HOURS] == hour:
+                recent.append((age, self._values[hour % HOURS]))
+
+        if sum(1 for age, _ in recent if age < 3) < MIN_RECENT:
+            return None
+
+        highest = max(value for _, value in recent)
+        lowest = min(value for _, value in recent)
+        weight = max(MIN_WEIGHT, lowest / highest) if highest > 0 else 1.0
+        total = weights = 0.0
+        for age, value in recent:
+            factor = weight**age
+            total += factor * value
+            weights += factor
+        return round(total / weights, 1)
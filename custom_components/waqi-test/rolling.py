@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from array import array
+from collections import Counter, deque
+from math import ceil, log
+
+# Relative error of the percentiles reported by QuantileSketch.
+SKETCH_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """Log-bucketed histogram (DDSketch) with removals, for sliding windows.
+
+    Values within ``accuracy`` of each other share a bucket, so the size
+    depends on the value range rather than on the number of samples, and
+    quantiles are within ``accuracy`` of the exact ones.
+    """
+
+    __slots__ = ("count", "_gamma", "_log_gamma", "_buckets", "_zeros")
+
+    def __init__(self, accuracy: float = SKETCH_ACCURACY) -> None:
+        """Initialize an empty sketch."""
+        self.count = 0
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = log(self._gamma)
+        self._buckets: Counter[int] = Counter()
+        self._zeros = 0
+
+    def _bucket(self, value: float) -> int:
+        return ceil(log(value) / self._log_gamma)
+
+    def add(self, value: float) -> None:
+        """Add a non-negative value."""
+        self.count += 1
+        if value <= 0:
+            self._zeros += 1
+        else:
+            self._buckets[self._bucket(value)] += 1
+
+    def remove(self, value: float) -> None:
+        """Remove a value added before."""
+        self.count -= 1
+        if value <= 0:
+            self._zeros -= 1
+            return
+        bucket = self._bucket(value)
+        self._buckets[bucket] -= 1
+        if not self._buckets[bucket]:
+            del self._buckets[bucket]
+
+    def quantile(self, q: float) -> float | None:
+        """Return the approximate ``q`` quantile, or None when empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if rank < seen:
+                return 2 * self._gamma**bucket / (self._gamma + 1)
+        return None
+
+
+class RollingWindow:
+    """Mean, maximum and 95th percentile of the samples of the last ``span`` s.
+
+    Samples are kept in two flat arrays consumed from ``_head``. The sum is
+    kept as samples enter and leave, the maximum with a monotonic deque and
+    the percentile with a QuantileSketch, so each update is O(1) amortized.
+    """
+
+    __slots__ = ("span", "_times", "_values", "_head", "_sum", "_max", "_sketch")
+
+    def __init__(self, span: float) -> None:
+        """Initialize an empty window."""
+        self.span = span
+        self._times = array("d")
+        self._values = array("d")
+        self._head = 0
+        self._sum = 0.0
+        self._max: deque[tuple[float, float]] = deque()
+        self._sketch = QuantileSketch()
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._times) - self._head
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a sample; samples not newer than the last one are ignored."""
+        if len(self) and timestamp <= self._times[-1]:
+            return
+        self._times.append(timestamp)
+        self._values.append(value)
+        self._sum += value
+        self._sketch.add(value)
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+        self._evict(timestamp - self.span)
+
+    def _evict(self, cutoff: float) -> None:
+        while self._head < len(self._times) and self._times[self._head] <= cutoff:
+            value = self._values[self._head]
+            self._sum -= value
+            self._sketch.remove(value)
+            if self._max[0][0] == self._times[self._head]:
+                self._max.popleft()
+            self._head += 1
+
+        # Drop the consumed prefix once it makes up half of the arrays.
+        if self._head > len(self._times) // 2:
+            del self._times[: self._head]
+            del self._values[: self._head]
+            self._head = 0
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the window."""
+        return round(self._sum / len(self), 1) if len(self) else None
+
+    @property
+    def max(self) -> float | None:
+        """Return the maximum of the window."""
+        return round(self._max[0][1], 1) if self._max else None
+
+    @property
+    def p95(self) -> float | None:
+        """Return the 95th percentile of the window."""
+        value = self._sketch.quantile(0.95)
+        return None if value is None else round(value, 1)
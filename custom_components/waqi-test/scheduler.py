@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from statistics import median
+import zlib
+
+# Seconds to wait after the expected publish time before polling, the
+# shortest delay ever scheduled, and the first back-off step when a
+# station is late.
+PUBLISH_MARGIN = 60
+MIN_POLL_DELAY = 60
+RETRY_DELAY = 120
+
+HISTORY = 8
+# Observations found without a miss before polling earlier, in case the
+# publish lag got shorter.
+PROBE_AFTER = 24
+
+
+def phase_offset(station_id: str, interval: float) -> float:
+    """Return a stable offset in [0, interval) derived from the station id.
+
+    Entries set up together at boot would otherwise all poll at the same
+    moment; hashing the id spreads them evenly over the interval and keeps
+    each station in the same slot across restarts.
+    """
+    return zlib.crc32(station_id.encode()) / 2**32 * interval
+
+
+def retry_delay(failures: int, max_delay: float) -> float:
+    """Return the delay before retrying after ``failures`` failed polls."""
+    return max(MIN_POLL_DELAY, min(max_delay, RETRY_DELAY * 2 ** (failures - 1)))
+
+
+class PublishCadence:
+    """Learn when a station publishes and when it is worth polling again.
+
+    The publish period is the median gap between successive observation
+    timestamps. The publish lag lies between the last poll that still saw
+    the previous observation and the first one that saw the new one. Polls
+    aim at the middle of that bracket, halving it each cycle until it is
+    within PUBLISH_MARGIN. After PROBE_AFTER hits in a row, polls move
+    earlier again in case the lag got shorter. When the station is late,
+    the delay backs off exponentially. Once the lag is known, polls come
+    ``phase`` seconds later so stations publishing together are not polled
+    at once. No delay exceeds the configured interval.
+    """
+
+    def __init__(self, max_delay: float, phase: float = 0.0) -> None:
+        """Initialize the cadence tracker."""
+        self.max_delay = max_delay
+        self.phase = phase
+        self._observed: datetime | None = None
+        self._last_miss: datetime | None = None
+        self._periods: deque[float] = deque(maxlen=HISTORY)
+        self._lower: float | None = None
+        self._upper: float | None = None
+        self._misses = 0
+        self._hits = 0
+
+    def record(self, observed: datetime | None, now: datetime) -> None:
+        """Record the observation timestamp returned by a poll at ``now``."""
+        if observed is None:
+            return
+
+        if self._observed is not None and observed <= self._observed:
+            # Polls forced by the configured interval before the aimed one
+            # do not make the station late.
+            if not self._periods or self._until_expected(now) < 1:
+                self._misses += 1
+            self._last_miss = now
+            return
+
+        if self._observed is not None:
+            self._periods.append((observed - self._observed).total_seconds())
+            self._record_lag(observed, now)
+        self._observed = observed
+        self._last_miss = None
+        self._misses = 0
+
+    def _record_lag(self, observed: datetime, now: datetime) -> None:
+        """Narrow the publish lag down to (last miss, first hit]."""
+        upper = max(0.0, (now - observed).total_seconds())
+        lower = None
+        if self._last_miss is not None and self._last_miss >= observed:
+            lower = (self._last_miss - observed).total_seconds()
+
+        # A lag that moved makes the brackets disagree; start over from
+        # the latest one.
+        if (
+            lower is not None and self._upper is not None and lower >= self._upper
+        ) or (self._lower is not None and upper <= self._lower):
+            self._lower = self._upper = None
+
+        # Only the tightest bounds are kept: polls forced by the configured
+        # interval bracket the lag loosely and must not widen it again.
+        if self._upper is None or upper < self._upper:
+            self._upper = upper
+        if lower is not None and (self._lower is None or lower > self._lower):
+            self._lower = lower
+        if self._misses:
+            self._hits = 0
+        else:
+            self._hits += 1
+
+    @property
+    def lag(self) -> float:
+        """Return the publish lag to plan the next poll with."""
+        lower, upper = self._lower or 0.0, self._upper or 0.0
+        if upper - lower > PUBLISH_MARGIN:
+            return (lower + upper) / 2
+        if self._hits < PROBE_AFTER:
+            return upper + PUBLISH_MARGIN + self.phase
+        probe = PUBLISH_MARGIN * 2 ** (self._hits - PROBE_AFTER)
+        return max(0.0, upper + self.phase - probe)
+
+    def _until_expected(self, now: datetime) -> float:
+        """Return the seconds from ``now`` to the poll aimed at the next one."""
+        assert self._observed is not None
+        period = median(self._periods)
+        return (self._observed - now).total_seconds() + period + self.lag
+
+    def next_delay(self, now: datetime) -> float:
+        """Return the number of seconds until the next poll."""
+        if self._observed is None or not self._periods:
+            return self.max_delay
+
+        expected = self._until_expected(now)
+        if expected <= 0:
+            expected = RETRY_DELAY * 2**self._misses + self.phase
+        return max(MIN_POLL_DELAY, min(self.max_delay, expected))
@@ -1,15 +1,13 @@
-from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -24,21 +22,28 @@ from homeassistant.const import (
     TEMP_CELSIUS,
 )
 
-from .const import DOMAIN
+from .aqi import POLLUTANTS
+from .const import DOMAIN, ROLLING_WINDOWS
+from .coordinator import WAQIDataUpdateCoordinator, WAQIHub
+from .home import HOME_KEYS, HomeCoordinator
 
 
 @dataclass
-class EntityDescriptionMixin:
-    """Mixin used to handle data for the WAQI sensors."""
+class WAQISensorEntityDescription(SensorEntityDescription):
+    """Class describing WAQI sensor entities.
 
-    found_fn: Callable[[dict[str, Any]], StateType]
-    value_fn: Callable[[dict[str, Any]], StateType]
+    The key selects the value in the coordinator's extracted values, see
+    snapshot.VALUE_PATHS.
+    """
 
 
-@dataclass
-class WAQISensorEntityDescription(SensorEntityDescription, EntityDescriptionMixin):
-    """Class describing WAQI sensor entities."""
-
+BUDGET_DESCRIPTION = SensorEntityDescription(
+    key="budget_used",
+    icon="mdi:speedometer",
+    name="API budget used",
+    native_unit_of_measurement=PERCENTAGE,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
 
 SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
     WAQISensorEntityDescription(
@@ -46,8 +51,6 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         icon="mdi:air-filter",
         name="AQI",
         native_unit_of_measurement="AQI",
-        found_fn=lambda data: "aqi" in data,
-        value_fn=lambda data: data["aqi"],
     ),
     WAQISensorEntityDescription(
         key="pm25",
@@ -55,8 +58,6 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         name="PM2.5",
         native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "pm25" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["pm25"]["v"],
     ),
     WAQISensorEntityDescription(
         key="pm10",
@@ -64,8 +65,6 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         name="PM10",
         native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "pm10" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["pm10"]["v"],
     ),
     WAQISensorEntityDescription(
         key="humidity",
@@ -73,8 +72,6 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         name="Humidity",
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "h" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["h"]["v"],
     ),
     WAQISensorEntityDescription(
         key="pressure",
@@ -82,8 +79,6 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         name="Pressure",
         native_unit_of_measurement=PRESSURE_HPA,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "p" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["p"]["v"],
     ),
     WAQISensorEntityDescription(
         key="temperature",
@@ -91,16 +86,12 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         name="Temperature",
         native_unit_of_measurement=TEMP_CELSIUS,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "t" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["t"]["v"],
     ),
     WAQISensorEntityDescription(
         key="co",
         name="CO",
         native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "co" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["co"]["v"],
     ),
     WAQISensorEntityDescription(
         key="no2",
@@ -108,8 +99,6 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         name="NO2",
         native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "no2" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["no2"]["v"],
     ),
     WAQISensorEntityDescription(
         key="so2",
@@ -117,8 +106,6 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         name="SO2",
         native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "so2" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["so2"]["v"],
     ),
     WAQISensorEntityDescription(
         key="o3",
@@ -126,11 +113,52 @@ SENSOR_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = (
         name="O3",
         native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
         state_class=SensorStateClass.MEASUREMENT,
-        found_fn=lambda data: "o3" in data["iaqi"],
-        value_fn=lambda data: data["iaqi"]["o3"]["v"],
+    ),
+    WAQISensorEntityDescription(
+        key="pm25_nowcast",
+        device_class=SensorDeviceClass.PM25,
+        name="PM2.5 NowCast",
+        native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WAQISensorEntityDescription(
+        key="pm10_nowcast",
+        device_class=SensorDeviceClass.PM10,
+        name="PM10 NowCast",
+        native_unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WAQISensorEntityDescription(
+        key="local_aqi",
+        icon="mdi:air-filter",
+        name="Local AQI",
+        native_unit_of_measurement="AQI",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WAQISensorEntityDescription(
+        key="dominant_pollutant",
+        icon="mdi:molecule",
+        name="Dominant pollutant",
     ),
 )
 
+# Rolling aggregates of every pollutant, disabled by default so that only
+# the ones a user enables are recorded.
+ROLLING_STATS = {"mean": "mean", "max": "max", "p95": "95th percentile"}
+
+ROLLING_DESCRIPTIONS: tuple[WAQISensorEntityDescription, ...] = tuple(
+    replace(
+        description,
+        key=f"{description.key}_{window}_{stat}",
+        name=f"{description.name} {window} {label}",
+        entity_registry_enabled_default=False,
+    )
+    for description in SENSOR_DESCRIPTIONS
+    if description.key in POLLUTANTS
+    for window in ROLLING_WINDOWS
+    for stat, label in ROLLING_STATS.items()
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -139,17 +167,54 @@ async def async_setup_entry(
 ) -> None:
     """Set up sensor based on a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    if isinstance(coordinator, HomeCoordinator):
+        async_add_entities(
+            WAQIHomeSensor(coordinator, description, entry.unique_id, entry.title)
+            for description in SENSOR_DESCRIPTIONS
+            if description.key in HOME_KEYS
+        )
+        return
 
-    async_add_entities(
-        (
+    added: set[str] = set()
+
+    @callback
+    def async_add_new_sensors() -> None:
+        """Add sensors for values the station did not report before."""
+        new = [
+            description
+            for description in (*SENSOR_DESCRIPTIONS, *ROLLING_DESCRIPTIONS)
+            if description.key in coordinator.values and description.key not in added
+        ]
+        if not new:
+            return
+        added.update(description.key for description in new)
+        async_add_entities(
             WAQISensor(coordinator, description, entry.unique_id, entry.title)
-            for description in SENSOR_DESCRIPTIONS
-            if description.found_fn(coordinator.data)
-        ),
-    )
+            for description in new
+        )
+
+    async_add_new_sensors()
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_sensors))
+
+    @callback
+    def async_add_budget_sensor(hub: WAQIHub) -> CALLBACK_TYPE:
+        """Host the budget sensor of the token, returning its remover."""
+        sensor = WAQIBudgetSensor(hub, BUDGET_DESCRIPTION)
+        async_add_entities([sensor])
+
+        @callback
+        def async_remove() -> None:
+            # Unloading the entry already removed it with the platform.
+            if sensor.hass is not None and not sensor.removed:
+                hass.async_create_task(sensor.async_remove())
+
+        return async_remove
 
+    coordinator.async_add_budget_sensor = async_add_budget_sensor
+    coordinator.hub.async_assign_budget_sensor()
 
-class WAQISensor(CoordinatorEntity[DataUpdateCoordinator], SensorEntity):
+
+class WAQISensor(CoordinatorEntity[WAQIDataUpdateCoordinator], SensorEntity):
     """Defines a WAQI sensor entity."""
 
     _attr_attribution = "Data provided by the World Air Quality Index project."
@@ -157,7 +222,7 @@ class WAQISensor(CoordinatorEntity[DataUpdateCoordinator], SensorEntity):
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: WAQIDataUpdateCoordinator,
         entity_description: WAQISensorEntityDescription,
         unique_id: str,
         name: str,
@@ -180,4 +245,108 @@ class WAQISensor(CoordinatorEntity[DataUpdateCoordinator], SensorEntity):
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        return self.entity_description.value_fn(self.coordinator.data)
+        return self.coordinator.values.get(self.entity_description.key)
+
+    @property
+    def available(self) -> bool:
+        """Stay available on the last good data while WAQI cannot be reached."""
+        return self.coordinator.has_usable_data
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the data freshness and the forecast, if any."""
+        if not self.coordinator.data:
+            return None
+
+        age = self.coordinator.data_age
+        attributes: dict[str, Any] = {
+            "stale": self.coordinator.is_stale,
+            "data_age": None if age is None else round(age),
+        }
+        key = self.entity_description.key
+        if (forecast := self.coordinator.data.forecast.get(key)) is not None:
+            attributes["forecast"] = forecast.as_list()
+        return attributes
+
+
+class WAQIBudgetSensor(SensorEntity):
+    """Diagnostic sensor reporting the daily request budget spent on a token.
+
+    There is one per token, whatever the number of its stations; it is
+    polled since the budget changes with every request of the hub.
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self, hub: WAQIHub, entity_description: SensorEntityDescription
+    ) -> None:
+        """Initialize the sensor."""
+        self.hub = hub
+        self.entity_description = entity_description
+        self.removed = False
+
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, f"token-{hub.token_id}")},
+            name=f"WAQI token {hub.token_id}",
+        )
+
+        self._attr_unique_id = f"{DOMAIN}-{hub.token_id}-{entity_description.key}"
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Remember the sensor was removed, with its entry or its token."""
+        self.removed = True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the share of the daily budget used."""
+        return self.hub.throttle.budget_used
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the raw budget counters."""
+        throttle = self.hub.throttle
+        return {
+            "requests_today": throttle.used_today,
+            "daily_budget": throttle.daily_budget,
+            "rate_limit": throttle.rate,
+        }
+
+
+class WAQIHomeSensor(CoordinatorEntity[HomeCoordinator], SensorEntity):
+    """Defines a sensor interpolated at the home location."""
+
+    _attr_attribution = "Data provided by the World Air Quality Index project."
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: HomeCoordinator,
+        entity_description: WAQISensorEntityDescription,
+        unique_id: str,
+        name: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+
+        self.entity_description = entity_description
+
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, unique_id)},
+            name=name,
+        )
+
+        self._attr_unique_id = f"{DOMAIN}-{unique_id}-{entity_description.key}".lower()
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the interpolated value."""
+        return self.coordinator.data.get(self.entity_description.key)
+
+    @property
+    def available(self) -> bool:
+        """Return True while some nearby station reports the value."""
+        key = self.entity_description.key
+        return super().available and key in self.coordinator.data
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN, LOGGER
+from .history import async_backfill_statistics, read_history_csv
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_PATH = "path"
+
+SERVICE_IMPORT_HISTORY = "import_history"
+
+IMPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_PATH): cv.string,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_import_history(call: ServiceCall) -> None:
+        """Backfill long-term statistics from a WAQI history export."""
+        entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+        if entry is None or entry.domain != DOMAIN:
+            raise HomeAssistantError("Unknown WAQI config entry")
+
+        path = call.data[ATTR_PATH]
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Access to {path} is not allowed")
+
+        observations = await hass.async_add_executor_job(read_history_csv, path)
+        rows = async_backfill_statistics(hass, entry, observations)
+        LOGGER.info(
+            "Queued %s hourly statistics rows for %s from %s", rows, entry.title, path
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        async_import_history,
+        schema=IMPORT_HISTORY_SCHEMA,
+    )
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import client_context
+
+from .const import DATA_SESSION, DOMAIN
+
+# All traffic goes to api.waqi.info, so the whole pool is for one host.
+CONNECTION_LIMIT = 8
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+TIMEOUT = ClientTimeout(total=30, connect=10, sock_read=20)
+
+
+def create_waqi_session() -> ClientSession:
+    """Create a connection pool tuned for api.waqi.info."""
+    return ClientSession(
+        connector=TCPConnector(
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True,
+            ssl=client_context(),
+        ),
+        timeout=TIMEOUT,
+        headers={"User-Agent": SERVER_SOFTWARE, "Accept-Encoding": "gzip, deflate"},
+        auto_decompress=True,
+    )
+
+
+@callback
+def async_get_waqi_session(hass: HomeAssistant) -> ClientSession:
+    """Return the connection pool shared by all WAQI entries and flows."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (session := domain_data.get(DATA_SESSION)) is not None:
+        return session
+
+    session = create_waqi_session()
+    domain_data[DATA_SESSION] = session
+
+    @callback
+    def _async_close_session(_event: Event) -> None:
+        hass.async_create_task(session.close())
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    return session
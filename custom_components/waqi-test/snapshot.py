@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Hashable
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
+
+# Where each sensor key lives in a feed payload.
+VALUE_PATHS: dict[str, tuple[str, ...]] = {
+    "aqi": ("aqi",),
+    "pm25": ("iaqi", "pm25", "v"),
+    "pm10": ("iaqi", "pm10", "v"),
+    "humidity": ("iaqi", "h", "v"),
+    "pressure": ("iaqi", "p", "v"),
+    "temperature": ("iaqi", "t", "v"),
+    "co": ("iaqi", "co", "v"),
+    "no2": ("iaqi", "no2", "v"),
+    "so2": ("iaqi", "so2", "v"),
+    "o3": ("iaqi", "o3", "v"),
+}
+
+
+# Pollutants listed under forecast.daily in a feed payload.
+FORECAST_KEYS = ("pm25", "pm10", "o3", "uvi")
+
+
+def extract_values(data: dict[str, Any] | None) -> dict[str, StateType]:
+    """Flatten a feed payload into the values reported by the sensors.
+
+    Keys whose path is missing from the payload are left out, so the result
+    also tells which sensors the station supports.
+    """
+    values: dict[str, StateType] = {}
+    if not data:
+        return values
+
+    for key, path in VALUE_PATHS.items():
+        node: Any = data
+        try:
+            for part in path:
+                node = node[part]
+        except (KeyError, TypeError):
+            continue
+        values[key] = node
+    return values
+
+
+class DailyForecast:
+    """Daily forecast of one pollutant stored as flat typed arrays.
+
+    Day ``i`` is ``start + offsets[i]`` days, with its average, minimum and
+    maximum at the same index of ``avg``, ``min`` and ``max``.
+    """
+
+    __slots__ = ("start", "offsets", "avg", "min", "max")
+
+    def __init__(
+        self,
+        start: date,
+        offsets: array[int],
+        avg: array[float],
+        min: array[float],
+        max: array[float],
+    ) -> None:
+        """Initialize the forecast."""
+        self.start = start
+        self.offsets = offsets
+        self.avg = avg
+        self.min = min
+        self.max = max
+
+    @classmethod
+    def from_feed(cls, days: list[dict[str, Any]]) -> DailyForecast | None:
+        """Parse the list of days of one pollutant in forecast.daily."""
+        parsed = [
+            (day_date, entry)
+            for entry in days
+            if (day_date := dt_util.parse_date(entry.get("day", ""))) is not None
+        ]
+        if not parsed:
+            return None
+
+        start = parsed[0][0]
+        return cls(
+            start,
+            array("h", ((day_date - start).days for day_date, _ in parsed)),
+            array("f", (entry.get("avg", 0) for _, entry in parsed)),
+            array("f", (entry.get("min", 0) for _, entry in parsed)),
+            array("f", (entry.get("max", 0) for _, entry in parsed)),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DailyForecast:
+        """Restore a forecast stored with as_dict."""
+        return cls(
+            date.fromisoformat(data["start"]),
+            array("h", data["offsets"]),
+            array("f", data["avg"]),
+            array("f", data["min"]),
+            array("f", data["max"]),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable form."""
+        return {
+            "start": self.start.isoformat(),
+            "offsets": self.offsets.tolist(),
+            "avg": self.avg.tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+        }
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return one dict per day, as exposed in state attributes."""
+        return [
+            {
+                "date": (self.start + timedelta(days=offset)).isoformat(),
+                "avg": round(avg, 1),
+                "min": round(low, 1),
+                "max": round(high, 1),
+            }
+            for offset, avg, low, high in zip(
+                self.offsets, self.avg, self.min, self.max
+            )
+        ]
+
+
+def extract_forecast(data: dict[str, Any]) -> dict[str, DailyForecast]:
+    """Parse forecast.daily of a feed payload."""
+    daily = (data.get("forecast") or {}).get("daily") or {}
+    forecast: dict[str, DailyForecast] = {}
+    for key in FORECAST_KEYS:
+        if days := daily.get(key):
+            if (parsed := DailyForecast.from_feed(days)) is not None:
+                forecast[key] = parsed
+    return forecast
+
+
+class StationSnapshot:
+    """Compact view of a feed payload holding only what the sensors use.
+
+    The raw payload, with its forecast arrays and attributions, is only
+    kept when ``raw`` is passed, for diagnostics.
+    """
+
+    __slots__ = ("idx", "time", "observed", "position", "values", "forecast", "raw")
+
+    def __init__(
+        self,
+        idx: int | None,
+        time: int | None,
+        observed: datetime | None,
+        position: tuple[float, float] | None,
+        values: dict[str, StateType],
+        forecast: dict[str, DailyForecast],
+        raw: dict[str, Any] | None = None,
+    ) -> None:
+        """Initialize the snapshot."""
+        self.idx = idx
+        self.time = time
+        self.observed = observed
+        self.position = position
+        self.values = values
+        self.forecast = forecast
+        self.raw = raw
+
+    @classmethod
+    def from_feed(
+        cls, data: dict[str, Any], keep_raw: bool = False
+    ) -> StationSnapshot:
+        """Build a snapshot from a feed payload."""
+        time = data.get("time") or {}
+        geo = (data.get("city") or {}).get("geo") or ()
+        return cls(
+            idx=data.get("idx"),
+            time=time.get("v"),
+            observed=dt_util.parse_datetime(time["iso"]) if "iso" in time else None,
+            position=(float(geo[0]), float(geo[1])) if len(geo) == 2 else None,
+            values=extract_values(data),
+            forecast=extract_forecast(data),
+            raw=data if keep_raw else None,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> StationSnapshot:
+        """Restore a snapshot stored with as_dict."""
+        observed = data.get("observed")
+        position = data.get("position")
+        return cls(
+            idx=data.get("idx"),
+            time=data.get("time"),
+            observed=dt_util.parse_datetime(observed) if observed else None,
+            position=tuple(position) if position else None,
+            values=data.get("values", {}),
+            forecast={
+                key: DailyForecast.from_dict(forecast)
+                for key, forecast in data.get("forecast", {}).items()
+            },
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable form, without the raw payload."""
+        return {
+            "idx": self.idx,
+            "time": self.time,
+            "observed": self.observed.isoformat() if self.observed else None,
+            "position": list(self.position) if self.position else None,
+            "values": self.values,
+            "forecast": {
+                key: forecast.as_dict() for key, forecast in self.forecast.items()
+            },
+        }
+
+    @property
+    def key(self) -> Hashable:
+        """Return what identifies one published observation of the station."""
+        return self.time, self.values.get("aqi")
+
+    def with_aqi(self, aqi: StateType) -> StationSnapshot:
+        """Return a copy carrying a newer AQI, e.g. from a bounds request."""
+        return StationSnapshot(
+            self.idx,
+            self.time,
+            self.observed,
+            self.position,
+            {**self.values, "aqi": aqi},
+            self.forecast,
+            self.raw,
+        )
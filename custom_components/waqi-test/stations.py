@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from heapq import heappush, heapreplace, nlargest
+from math import asin, cos, radians, sin, sqrt
+import re
+from typing import Any, NamedTuple
+import unicodedata
+
+EARTH_RADIUS_KM = 6371.0
+
+# Share of the query trigrams a name must contain to count as a match.
+MIN_TRIGRAM_SCORE = 0.5
+
+Point = tuple[float, float, float]
+Node = tuple[int, int, "Node | None", "Node | None"]
+
+
+class Station(NamedTuple):
+    """A monitoring station of the catalogue."""
+
+    uid: int
+    name: str
+    lat: float
+    lon: float
+
+    @property
+    def station_id(self) -> str:
+        """Return the feed id used for config entries."""
+        return f"@{self.uid}"
+
+    @classmethod
+    def from_bounds(cls, data: dict[str, Any]) -> Station:
+        """Build a station from a map/bounds result."""
+        return cls(data["uid"], data["station"]["name"], data["lat"], data["lon"])
+
+    @classmethod
+    def from_search(cls, data: dict[str, Any]) -> Station | None:
+        """Build a station from a search result, if it has coordinates."""
+        geo = data["station"].get("geo") or ()
+        if len(geo) != 2:
+            return None
+        return cls(data["uid"], data["station"]["name"], geo[0], geo[1])
+
+
+def _chord_to_km(chord: float) -> float:
+    """Convert a chord length on the unit sphere to a great-circle distance."""
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, chord / 2))
+
+
+def _to_xyz(lat: float, lon: float) -> Point:
+    """Project a coordinate on the unit sphere.
+
+    Euclidean (chord) distance between projected points grows with the
+    great-circle distance, and there is no longitude wrap to care about.
+    """
+    phi, lam = radians(lat), radians(lon)
+    return cos(phi) * cos(lam), cos(phi) * sin(lam), sin(phi)
+
+
+class StationIndex:
+    """k-d tree over the station catalogue for nearest-station lookups."""
+
+    __slots__ = ("stations", "_points", "_root")
+
+    def __init__(self, stations: Iterable[Station]) -> None:
+        """Build the index."""
+        self.stations = list(stations)
+        self._points = [_to_xyz(station.lat, station.lon) for station in self.stations]
+        self._root = self._build(list(range(len(self.stations))), 0)
+
+    def __len__(self) -> int:
+        """Return the number of indexed stations."""
+        return len(self.stations)
+
+    def _build(self, indices: list[int], depth: int) -> Node | None:
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda index: self._points[index][axis])
+        middle = len(indices) // 2
+        return (
+            indices[middle],
+            axis,
+            self._build(indices[:middle], depth + 1),
+            self._build(indices[middle + 1 :], depth + 1),
+        )
+
+    def nearest(
+        self, lat: float, lon: float, count: int
+    ) -> list[tuple[float, Station]]:
+        """Return the ``count`` closest stations with their distance in km."""
+        target = _to_xyz(lat, lon)
+        points = self._points
+        # Max-heap on the squared chord distance, holding the best candidates.
+        best: list[tuple[float, int]] = []
+
+        def visit(node: Node | None) -> None:
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = points[index]
+            distance = (
+                (target[0] - point[0]) ** 2
+                + (target[1] - point[1]) ** 2
+                + (target[2] - point[2]) ** 2
+            )
+            if len(best) < count:
+                heappush(best, (-distance, index))
+            elif distance < -best[0][0]:
+                heapreplace(best, (-distance, index))
+
+            offset = target[axis] - point[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if len(best) < count or offset * offset < -best[0][0]:
+                visit(far)
+
+        if count > 0:
+            visit(self._root)
+
+        return [
+            (_chord_to_km(sqrt(-distance)), self.stations[index])
+            for distance, index in sorted(best, reverse=True)
+        ]
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two coordinates."""
+    a, b = _to_xyz(lat1, lon1), _to_xyz(lat2, lon2)
+    return _chord_to_km(
+        sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+    )
+
+
+def normalize_name(name: str) -> str:
+    """Fold case and accents and keep only letters and digits."""
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.findall(r"[^\W_]+", stripped))
+
+
+def trigrams(name: str) -> set[str]:
+    """Return the trigrams of every word of a normalized name."""
+    grams: set[str] = set()
+    for word in name.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Typo tolerant station name search over the catalogue.
+
+    Postings are compact arrays of station positions per trigram. A station
+    scores the share of the query trigrams found in its name, so a city
+    name matches the longer "City-District, Country" station names.
+    """
+
+    __slots__ = ("stations", "_postings", "_sizes")
+
+    def __init__(self, stations: Iterable[Station]) -> None:
+        """Build the index."""
+        self.stations = list(stations)
+        postings: dict[str, list[int]] = {}
+        sizes = array("H")
+        for position, station in enumerate(self.stations):
+            grams = trigrams(normalize_name(station.name))
+            sizes.append(min(len(grams), 0xFFFF))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self._postings = {gram: array("I", items) for gram, items in postings.items()}
+        self._sizes = sizes
+
+    def search(
+        self, query: str, limit: int, min_score: float = MIN_TRIGRAM_SCORE
+    ) -> list[Station]:
+        """Return up to ``limit`` stations whose name best matches the query."""
+        grams = trigrams(normalize_name(query))
+        if not grams:
+            return []
+
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            if (positions := self._postings.get(gram)) is not None:
+                shared.update(positions)
+
+        minimum = min_score * len(grams)
+        ranked = nlargest(
+            limit,
+            (
+                (count, -self._sizes[position], position)
+                for position, count in shared.items()
+                if count >= minimum
+            ),
+        )
+        return [self.stations[position] for _, _, position in ranked]
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_FEED_CACHE, DATA_STATION_CATALOG, DOMAIN
+from .snapshot import StationSnapshot
+from .stations import Station, StationIndex, TrigramIndex
+
+STORAGE_KEY = f"{DOMAIN}.feeds"
+STORAGE_VERSION = 3
+SAVE_DELAY = 30
+
+CATALOG_STORAGE_KEY = f"{DOMAIN}.stations"
+CATALOG_STORAGE_VERSION = 1
+CATALOG_MAX_AGE = timedelta(days=7)
+
+
+class FeedStore(Store[dict[str, dict[str, Any]]]):
+    """Store holding one serialized snapshot per station and the token budgets."""
+
+    async def _async_migrate_func(
+        self,
+        old_major_version: int,
+        old_minor_version: int,
+        old_data: dict[str, Any],
+    ) -> dict[str, dict[str, Any]]:
+        """Convert the raw feed payloads of version 1 and add the budgets."""
+        if old_major_version == 1:
+            old_data = {
+                station_id: StationSnapshot.from_feed(data).as_dict()
+                for station_id, data in old_data.items()
+            }
+        if old_major_version < 3:
+            return {"feeds": old_data, "budgets": {}}
+        return old_data
+
+
+class FeedCache:
+    """Last good snapshot per station, persisted across restarts.
+
+    The same store keeps the requests each token made today, keyed on a hash
+    of the token, so a restart does not reset the daily budget.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store = FeedStore(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._feeds: dict[str, dict[str, Any]] = {}
+        self._budgets: dict[str, dict[str, Any]] = {}
+        self._load_task: asyncio.Task[None] | None = None
+
+    async def async_load(self) -> None:
+        """Load the stored snapshots once, however many entries ask for it."""
+        if self._load_task is None:
+            self._load_task = asyncio.create_task(self._async_load())
+        await self._load_task
+
+    async def _async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self._feeds = data.get("feeds", {})
+        self._budgets = data.get("budgets", {})
+
+    def get(self, station_id: str) -> StationSnapshot | None:
+        """Return the cached snapshot of a station."""
+        if (data := self._feeds.get(station_id)) is None:
+            return None
+        return StationSnapshot.from_dict(data)
+
+    @callback
+    def async_set(self, station_id: str, snapshot: StationSnapshot) -> None:
+        """Remember a snapshot; writes are batched by the store."""
+        self._feeds[station_id] = snapshot.as_dict()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, station_id: str) -> None:
+        """Forget a station."""
+        if self._feeds.pop(station_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get_budget(self, token_id: str) -> tuple[date, int] | None:
+        """Return the UTC day and request count last saved for a token."""
+        if (budget := self._budgets.get(token_id)) is None:
+            return None
+        return date.fromisoformat(budget["day"]), budget["used"]
+
+    @callback
+    def async_set_budget(self, token_id: str, day: date, used: int) -> None:
+        """Remember the requests a token made on a UTC day."""
+        self._budgets[token_id] = {"day": day.isoformat(), "used": used}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        return {"feeds": self._feeds, "budgets": self._budgets}
+
+
+async def async_get_feed_cache(hass: HomeAssistant) -> FeedCache:
+    """Return the loaded feed cache shared by all entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_FEED_CACHE not in domain_data:
+        domain_data[DATA_FEED_CACHE] = FeedCache(hass)
+    cache: FeedCache = domain_data[DATA_FEED_CACHE]
+    await cache.async_load()
+    return cache
+
+
+class StationCatalog:
+    """Locally cached list of all stations, with a spatial index over it."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the catalogue."""
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, CATALOG_STORAGE_VERSION, CATALOG_STORAGE_KEY
+        )
+        self._stations: dict[int, Station] = {}
+        self._updated: datetime | None = None
+        self._index: StationIndex | None = None
+        self._name_index: TrigramIndex | None = None
+        self._load_task: asyncio.Task[None] | None = None
+
+    async def async_load(self) -> None:
+        """Load the stored catalogue once, however many callers ask for it."""
+        if self._load_task is None:
+            self._load_task = asyncio.create_task(self._async_load())
+        await self._load_task
+
+    async def _async_load(self) -> None:
+        if not (data := await self._store.async_load()):
+            return
+        self._updated = dt_util.parse_datetime(data["updated"] or "")
+        self._stations = {row[0]: Station(*row) for row in data["stations"]}
+
+    def __len__(self) -> int:
+        """Return the number of known stations."""
+        return len(self._stations)
+
+    @property
+    def is_stale(self) -> bool:
+        """Return True when the catalogue should be fetched again."""
+        if self._updated is None:
+            return True
+        return dt_util.utcnow() - self._updated > CATALOG_MAX_AGE
+
+    async def async_get_index(self) -> StationIndex:
+        """Return the spatial index, rebuilt in the executor after changes."""
+        if self._index is None:
+            self._index = await self._hass.async_add_executor_job(
+                StationIndex, list(self._stations.values())
+            )
+        return self._index
+
+    async def async_get_name_index(self) -> TrigramIndex:
+        """Return the name search index, rebuilt in the executor after changes."""
+        if self._name_index is None:
+            self._name_index = await self._hass.async_add_executor_job(
+                TrigramIndex, list(self._stations.values())
+            )
+        return self._name_index
+
+    @callback
+    def async_update(self, stations: Iterable[Station], complete: bool = False) -> None:
+        """Merge stations; ``complete`` marks a full catalogue download."""
+        changed = False
+        for station in stations:
+            if self._stations.get(station.uid) != station:
+                self._stations[station.uid] = station
+                changed = True
+        if complete:
+            self._updated = dt_util.utcnow()
+        if changed or complete:
+            self._index = None
+            self._name_index = None
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "updated": self._updated.isoformat() if self._updated else None,
+            "stations": [list(station) for station in self._stations.values()],
+        }
+
+
+async def async_get_station_catalog(hass: HomeAssistant) -> StationCatalog:
+    """Return the loaded station catalogue."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_STATION_CATALOG not in domain_data:
+        domain_data[DATA_STATION_CATALOG] = StationCatalog(hass)
+    catalog: StationCatalog = domain_data[DATA_STATION_CATALOG]
+    await catalog.async_load()
+    return catalog
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timezone
+import time
+
+import waqi_client_async as waqi
+
+
+class BudgetExhausted(Exception):
+    """Raised when the daily request budget of a token has been spent."""
+
+
+class RequestThrottle:
+    """Token bucket limiting the request rate and daily budget of one API token.
+
+    Callers queue on a FIFO lock, so requests are spread at ``rate`` per
+    second with bursts of at most ``burst``. The daily budget is a hard cap
+    per UTC day: once spent, requests are refused locally instead of being
+    rejected upstream as over quota.
+    """
+
+    def __init__(self, rate: float, daily_budget: int, burst: int = 1) -> None:
+        """Initialize the throttle."""
+        self.rate = rate
+        self.daily_budget = daily_budget
+        self.burst = burst
+
+        self.used_today = 0
+        self._day = datetime.now(timezone.utc).date()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def day(self) -> date:
+        """Return the UTC day ``used_today`` counts requests for."""
+        return self._day
+
+    @property
+    def budget_used(self) -> float:
+        """Return the share of today's budget already spent, in percent."""
+        self._roll_day(datetime.now(timezone.utc).date())
+        return round(100 * self.used_today / self.daily_budget, 1)
+
+    def configure(self, rate: float, daily_budget: int) -> None:
+        """Apply new limits, keeping today's usage."""
+        self.rate = rate
+        self.daily_budget = daily_budget
+
+    def restore(self, day: date, used: int) -> None:
+        """Resume counting from the usage saved before a restart."""
+        self._roll_day(datetime.now(timezone.utc).date())
+        if day == self._day:
+            self.used_today = max(self.used_today, used)
+
+    def _roll_day(self, today: date) -> None:
+        if today != self._day:
+            self._day = today
+            self.used_today = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait for a request slot, raising BudgetExhausted past the daily cap."""
+        async with self._lock:
+            self._roll_day(datetime.now(timezone.utc).date())
+            if self.used_today >= self.daily_budget:
+                raise BudgetExhausted(
+                    f"Daily budget of {self.daily_budget} requests spent"
+                )
+
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+
+            self._tokens -= 1
+            self.used_today += 1
+
+
+class CircuitOpen(Exception):
+    """Raised instead of sending a request while the token is suspended."""
+
+
+class CircuitBreaker:
+    """Suspend all requests of a token after it was rejected upstream.
+
+    Being over quota opens the breaker with an exponential back-off, capped
+    at ``maximum`` seconds. An invalid token keeps it open until a config
+    flow tries the token again, or the entries get a new token.
+    """
+
+    def __init__(self, base: float, maximum: float) -> None:
+        """Initialize the breaker."""
+        self.base = base
+        self.maximum = maximum
+        self.invalid_token = False
+        self.open_until = 0.0
+        self._failures = 0
+
+    @property
+    def remaining(self) -> float:
+        """Return the seconds left before requests are allowed again."""
+        return max(0.0, self.open_until - time.monotonic())
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are suspended for being over quota."""
+        return self.remaining > 0
+
+    def check(self) -> None:
+        """Raise when no request should be sent."""
+        if self.invalid_token:
+            raise waqi.InvalidToken("Invalid key")
+        if self.is_open:
+            raise CircuitOpen(
+                f"Over quota, requests suspended for {self.remaining:.0f} s"
+            )
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        self._failures = 0
+        self.open_until = 0.0
+        self.invalid_token = False
+
+    def reset_invalid_token(self) -> None:
+        """Let the next request check the token upstream again."""
+        self.invalid_token = False
+
+    def record_over_quota(self) -> None:
+        """Open the breaker, doubling the back-off on each failure in a row."""
+        delay = min(self.maximum, self.base * 2**self._failures)
+        self._failures += 1
+        self.open_until = time.monotonic() + delay
+
+    def record_invalid_token(self) -> None:
+        """Open the breaker for good."""
+        self.invalid_token = True
@@ -0,0 +1,18 @@
+"""Benchmarks of the WAQI integration, run from the repository root.
+
+    python -m scripts.bench_extract
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from tests import load_module  # noqa: F401
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_feed() -> dict[str, Any]:
+    """Return the data of a feed response in the shape api.waqi.info sends."""
+    return json.loads((FIXTURES / "feed.json").read_text())["data"]
@@ -0,0 +1,42 @@
+"""Time to compute the local AQI of 10k stations on every scale.
+
+Each station gets random US EPA sub-indices for a random subset of the
+pollutants, as WAQI feeds do; the coordinators run compute_aqi once per
+new observation.
+"""
+from __future__ import annotations
+
+import random
+import time
+
+from . import load_module
+
+STATIONS = 10_000
+
+aqi = load_module("aqi")
+
+
+def main() -> None:
+    """Print the cost of one pass over every station, per scale."""
+    random.seed(0)
+    stations = [
+        {
+            pollutant: random.uniform(1, 300)
+            for pollutant in aqi.POLLUTANTS
+            if random.random() < 0.7
+        }
+        for _ in range(STATIONS)
+    ]
+
+    print(f"{STATIONS} stations:")
+    for scale in aqi.SCALES:
+        started = time.perf_counter()
+        for values in stations:
+            aqi.compute_aqi(values, scale)
+        elapsed = time.perf_counter() - started
+        each = elapsed / STATIONS * 1e6
+        print(f"  {scale:<8} {elapsed * 1000:7.1f} ms  ({each:.2f} us per station)")
+
+
+if __name__ == "__main__":
+    main()
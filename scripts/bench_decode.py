@@ -0,0 +1,35 @@
+"""Time to decode 10k feed responses, with orjson and with the stdlib.
+
+The body is the sample feed of the fixtures, compacted as it comes over the
+wire, forecast arrays and attributions included.
+"""
+from __future__ import annotations
+
+from functools import partial
+import json
+from timeit import repeat
+
+from . import FIXTURES, load_module
+
+DECODES = 10_000
+
+api = load_module("api")
+
+
+def main() -> None:
+    """Print the cost of decoding DECODES bodies per backend."""
+    payload = json.loads((FIXTURES / "feed.json").read_bytes())
+    body = json.dumps(payload, separators=(",", ":")).encode()
+
+    backend = "json" if api.orjson is None else "orjson"
+    decoders = {"json.loads": json.loads, f"api.loads ({backend})": api.loads}
+
+    print(f"{DECODES} decodes of a {len(body)} byte feed:")
+    for name, loads in decoders.items():
+        best = min(repeat(partial(loads, body), number=DECODES, repeat=5))
+        each = best / DECODES * 1e6
+        print(f"  {name:<20} {best * 1000:7.1f} ms  ({each:.1f} us each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Per-update cost of reading the sensor values of 1000 entities.
+
+Before, every entity walked the feed payload through its own value_fn
+lambda on each state read; now snapshot.extract_values flattens the payload
+once per station update and entities read a dict slot.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from timeit import repeat
+from typing import Any
+
+from . import load_feed, load_module
+
+STATIONS = 100
+ROUNDS = 200
+
+snapshot = load_module("snapshot")
+
+# The value_fn lambdas of the descriptions before the key-path table.
+VALUE_FNS: tuple[Callable[[dict[str, Any]], Any], ...] = (
+    lambda data: data["aqi"],
+    lambda data: data["iaqi"]["pm25"]["v"],
+    lambda data: data["iaqi"]["pm10"]["v"],
+    lambda data: data["iaqi"]["h"]["v"],
+    lambda data: data["iaqi"]["p"]["v"],
+    lambda data: data["iaqi"]["t"]["v"],
+    lambda data: data["iaqi"]["co"]["v"],
+    lambda data: data["iaqi"]["no2"]["v"],
+    lambda data: data["iaqi"]["so2"]["v"],
+    lambda data: data["iaqi"]["o3"]["v"],
+)
+
+
+def main() -> None:
+    """Print the cost of one update of every station, per approach."""
+    feeds = [load_feed() for _ in range(STATIONS)]
+    keys = list(snapshot.VALUE_PATHS)
+    entities = STATIONS * len(keys)
+
+    def lambdas() -> None:
+        for data in feeds:
+            for value_fn in VALUE_FNS:
+                value_fn(data)
+
+    def table() -> None:
+        for data in feeds:
+            values = snapshot.extract_values(data)
+            for key in keys:
+                values.get(key)
+
+    print(f"{entities} entities over {STATIONS} stations, per update:")
+    for name, func in (("per-sensor lambdas", lambdas), ("key-path table", table)):
+        best = min(repeat(func, number=ROUNDS, repeat=5)) / ROUNDS
+        per_entity = best / entities * 1e9
+        print(f"  {name:<20} {best * 1e6:8.1f} us  ({per_entity:.0f} ns/entity)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Rows per second of the history backfill, from CSV to recorder batches.
+
+It times reading an hourly export, aggregating it into hourly statistics
+and slicing it into BATCH_SIZE import calls; the recorder writes the batches
+in its own thread afterwards. Needs Home Assistant with the recorder.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from importlib import import_module
+from pathlib import Path
+import random
+import tempfile
+import time
+
+YEARS = 5
+KEYS = ("pm25", "pm10", "o3", "no2", "so2", "co")
+
+history = import_module("custom_components.waqi-test.history")
+
+
+def write_export(path: Path) -> int:
+    """Write an hourly export with a few blank cells, returning its rows."""
+    start = datetime(2020, 1, 1)
+    hours = YEARS * 365 * 24
+    with path.open("w", encoding="utf-8") as file:
+        file.write(", ".join(("date", *KEYS)) + "\n")
+        for hour in range(hours):
+            moment = start + timedelta(hours=hour)
+            cells = [
+                "" if random.random() < 0.05 else str(random.randint(1, 150))
+                for _ in KEYS
+            ]
+            file.write(", ".join((moment.strftime("%Y-%m-%d %H:%M"), *cells)) + "\n")
+    return hours
+
+
+def main() -> None:
+    """Print the throughput of each stage of the backfill."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "history.csv"
+        rows = write_export(path)
+
+        started = time.perf_counter()
+        observations = history.read_history_csv(str(path))
+        parsed = time.perf_counter()
+        hourly = history.hourly_statistics(observations)
+        batches = [
+            statistics[index : index + history.BATCH_SIZE]
+            for statistics in hourly.values()
+            for index in range(0, len(statistics), history.BATCH_SIZE)
+        ]
+        done = time.perf_counter()
+
+    imported = sum(len(statistics) for statistics in hourly.values())
+    print(f"{rows} export rows, {imported} statistics rows in {len(batches)} batches")
+    print(f"  read CSV      {rows / (parsed - started):10.0f} export rows/s")
+    print(f"  aggregate     {imported / (done - parsed):10.0f} statistics rows/s")
+    print(f"  end to end    {imported / (done - started):10.0f} statistics rows/s")
+
+
+if __name__ == "__main__":
+    main()
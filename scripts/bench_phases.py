@@ -0,0 +1,109 @@
+"""Most feed requests in flight at once, with and without station phases.
+
+STATIONS entries of one token are set up together at boot and publish at
+the same minute past the hour, as stations of one network do. Each poll
+is a request of LATENCY seconds and the throttle is out of the way, so
+any overlap shows. Without phases every station is polled at the same
+moment. With the boot offset alone they meet again once the cadence has
+learned the shared lag; the phase within PUBLISH_MARGIN keeps them apart.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import heapq
+
+from . import load_module
+
+STATIONS = 1000
+INTERVAL = 900
+LAG = 300
+LATENCY = 0.5
+DAYS = 2
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HOUR = 3600
+
+scheduler = load_module("scheduler")
+
+
+def observed_at(now: datetime) -> datetime | None:
+    """Return the observation an hourly station serves at ``now``."""
+    elapsed = (now - START).total_seconds() - LAG
+    if elapsed < 0:
+        return None
+    return START + timedelta(seconds=elapsed // HOUR * HOUR)
+
+
+def run(offset: bool, phased: bool) -> tuple[int, int]:
+    """Return the most requests in flight at once, overall and on the last day."""
+    station_ids = [f"@{uid}" for uid in range(STATIONS)]
+    cadences = {
+        station_id: scheduler.PublishCadence(
+            INTERVAL,
+            scheduler.phase_offset(station_id, scheduler.PUBLISH_MARGIN)
+            if phased
+            else 0.0,
+        )
+        for station_id in station_ids
+    }
+    queue = [
+        (
+            START
+            + timedelta(
+                seconds=scheduler.phase_offset(station_id, INTERVAL)
+                if offset
+                else INTERVAL
+            ),
+            station_id,
+        )
+        for station_id in station_ids
+    ]
+    heapq.heapify(queue)
+
+    end = START + timedelta(days=DAYS)
+    requests: list[datetime] = []
+    while queue[0][0] < end:
+        now, station_id = heapq.heappop(queue)
+        requests.append(now)
+        cadence = cadences[station_id]
+        cadence.record(observed_at(now), now)
+        delay = cadence.next_delay(now)
+        heapq.heappush(queue, (now + timedelta(seconds=delay), station_id))
+
+    last_day = end - timedelta(days=1)
+    return max_in_flight(requests), max_in_flight(
+        [started for started in requests if started >= last_day]
+    )
+
+
+def max_in_flight(starts: list[datetime]) -> int:
+    """Return the most requests of LATENCY seconds overlapping at any moment."""
+    events = sorted(
+        [(started, 1) for started in starts]
+        + [(started + timedelta(seconds=LATENCY), -1) for started in starts]
+    )
+    in_flight = peak = 0
+    for _, change in events:
+        in_flight += change
+        peak = max(peak, in_flight)
+    return peak
+
+
+def main() -> None:
+    """Print the peak concurrency of each schedule."""
+    print(
+        f"{STATIONS} stations publishing {LAG} s past the hour, "
+        f"{INTERVAL} s interval, {LATENCY} s per request:"
+    )
+    schedules = {
+        "zero offset": (False, False),
+        "boot offset only": (True, False),
+        "phase_offset": (True, True),
+    }
+    for name, (offset, phased) in schedules.items():
+        overall, steady = run(offset, phased)
+        print(f"  {name:<18} {overall:4d} in flight at most, {steady:4d} on day {DAYS}")
+
+
+if __name__ == "__main__":
+    main()
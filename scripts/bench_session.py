@@ -0,0 +1,83 @@
+"""Requests per second and p99 latency of the WAQI session, on a local server.
+
+A stand-in for api.waqi.info serves the sample feed, gzipped, on localhost.
+The tuned pool of session.py is compared with a session that opens a new
+connection for every request. Needs Home Assistant.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from importlib import import_module
+from statistics import quantiles
+import time
+
+from aiohttp import ClientSession, TCPConnector, web
+from aiohttp.test_utils import TestServer
+
+from . import FIXTURES
+
+REQUESTS = 2000
+CONCURRENCY = 8
+
+api = import_module("custom_components.waqi-test.api")
+session = import_module("custom_components.waqi-test.session")
+
+
+async def handle_feed(request: web.Request) -> web.Response:
+    """Serve the sample feed like api.waqi.info does."""
+    response = web.Response(body=request.app["body"], content_type="application/json")
+    response.enable_compression()
+    return response
+
+
+async def run(create: Callable[[], ClientSession]) -> tuple[float, list[float]]:
+    """Send REQUESTS feed requests from CONCURRENCY callers at once."""
+    latencies: list[float] = []
+    remaining = iter(range(REQUESTS))
+
+    async with create() as client:
+
+        async def caller() -> None:
+            for station in remaining:
+                started = time.perf_counter()
+                await api.async_get_feed(client, "token", f"@{station}")
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(caller() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+
+    return elapsed, latencies
+
+
+async def main() -> None:
+    """Print the throughput and tail latency of each session."""
+    app = web.Application()
+    app["body"] = (FIXTURES / "feed.json").read_bytes()
+    app.router.add_get("/feed/{station}/", handle_feed)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    api.API_URL = str(server.make_url("")).rstrip("/")
+
+    sessions: dict[str, Callable[[], ClientSession]] = {
+        "new connection per request": lambda: ClientSession(
+            connector=TCPConnector(force_close=True)
+        ),
+        "WAQI session": session.create_waqi_session,
+    }
+    print(f"{REQUESTS} feed requests from {CONCURRENCY} concurrent callers:")
+    try:
+        for name, create in sessions.items():
+            elapsed, latencies = await run(create)
+            p99 = quantiles(latencies, n=100)[98]
+            print(
+                f"  {name:<28} {REQUESTS / elapsed:7.0f} requests/s"
+                f"  p99 {p99 * 1000:6.2f} ms"
+            )
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Memory held per 1000 stations: raw feed dicts against StationSnapshot.
+
+Sizes are the Python allocations still alive once the data is built, as
+traced by tracemalloc, so they leave out the interpreter's own baseline.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+import gc
+import json
+import tracemalloc
+from typing import Any
+
+from . import FIXTURES, load_module
+
+STATIONS = 1000
+
+snapshot = load_module("snapshot")
+
+
+def measure(build: Callable[[], Any]) -> int:
+    """Return the bytes still allocated by what ``build`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main() -> None:
+    """Print the memory of 1000 stations for each way of holding them."""
+    body = (FIXTURES / "feed.json").read_bytes()
+
+    def feed() -> dict[str, Any]:
+        # A fresh decode per station, as each one comes from its own response.
+        return json.loads(body)["data"]
+
+    from_feed = snapshot.StationSnapshot.from_feed
+    results = {
+        "raw feed dict": measure(lambda: [feed() for _ in range(STATIONS)]),
+        "StationSnapshot": measure(
+            lambda: [from_feed(feed()) for _ in range(STATIONS)]
+        ),
+        "StationSnapshot, keep_raw": measure(
+            lambda: [from_feed(feed(), keep_raw=True) for _ in range(STATIONS)]
+        ),
+    }
+
+    baseline = results["raw feed dict"]
+    print(f"Memory per {STATIONS} stations:")
+    for name, size in results.items():
+        print(f"  {name:<27} {size / 1024:8.0f} KiB  ({size / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
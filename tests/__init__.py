@@ -0,0 +1,18 @@
+"""Tests for the WAQI integration."""
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+
+INTEGRATION = Path(__file__).resolve().parents[1] / "custom_components" / "waqi-test"
+
+
+def load_module(name: str) -> ModuleType:
+    """Load a self-contained module of the integration, without Home Assistant."""
+    spec = importlib.util.spec_from_file_location(
+        f"waqi_test_{name}", INTEGRATION / f"{name}.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
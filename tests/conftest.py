@@ -0,0 +1,30 @@
+"""Fixtures shared by the tests of the WAQI integration."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(request: pytest.FixtureRequest) -> None:
+    """Enable the integration under test for the tests running Home Assistant.
+
+    The other tests run without pytest-homeassistant-custom-component.
+    """
+    if "hass" in request.fixturenames:
+        request.getfixturevalue("enable_custom_integrations")
+
+
+def feed(uid: int, position: tuple[float, float] | None = None) -> dict[str, Any]:
+    """Return a minimal feed payload of a station."""
+    return {
+        "idx": uid,
+        "aqi": 42,
+        "time": {"v": 1767225600, "iso": "2026-01-01T00:00:00+00:00"},
+        "city": {
+            "name": f"Station {uid}",
+            "geo": list(position or (52.0 + uid / 100, 4.0)),
+        },
+        "iaqi": {"pm25": {"v": 42}},
+    }
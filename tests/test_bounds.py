@@ -0,0 +1,138 @@
+"""Tests for refreshing the AQI of stations through map/bounds requests."""
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from importlib import import_module
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .conftest import feed
+
+DOMAIN = import_module("custom_components.waqi-test.const").DOMAIN
+TOKEN = "token"
+
+# Three stations in each of two one-degree grid cells.
+POSITIONS = {
+    1: (52.1, 4.1),
+    2: (52.2, 4.2),
+    3: (52.3, 4.3),
+    4: (48.1, 2.1),
+    5: (48.2, 2.2),
+    6: (48.3, 2.3),
+}
+
+
+class FakeWAQI:
+    """Local stand-in for api.waqi.info counting the requests it serves."""
+
+    def __init__(self) -> None:
+        self.bounds: list[tuple[float, ...]] = []
+        self.feeds: list[str] = []
+
+    async def handle_bounds(self, request: web.Request) -> web.Response:
+        box = tuple(float(value) for value in request.query["latlng"].split(","))
+        self.bounds.append(box)
+        lat1, lng1, lat2, lng2 = box
+        return web.json_response(
+            {
+                "status": "ok",
+                "data": [
+                    {
+                        "uid": uid,
+                        "lat": lat,
+                        "lon": lng,
+                        "aqi": "55",
+                        "station": {"name": f"Station {uid}"},
+                    }
+                    for uid, (lat, lng) in POSITIONS.items()
+                    if lat1 <= lat <= lat2 and lng1 <= lng <= lng2
+                ],
+            }
+        )
+
+    async def handle_feed(self, request: web.Request) -> web.Response:
+        station = request.match_info["station"]
+        self.feeds.append(station)
+        uid = int(station[1:])
+        return web.json_response({"status": "ok", "data": feed(uid, POSITIONS[uid])})
+
+
+@pytest.fixture
+async def waqi_server() -> AsyncGenerator[FakeWAQI, None]:
+    """Serve the fake API and point the integration at it."""
+    fake = FakeWAQI()
+    app = web.Application()
+    app.router.add_get("/map/bounds/", fake.handle_bounds)
+    app.router.add_get("/feed/{station}/", fake.handle_feed)
+    server = TestServer(app)
+    await server.start_server()
+    with patch(
+        f"custom_components.{DOMAIN}.api.API_URL", str(server.make_url("")).rstrip("/")
+    ):
+        yield fake
+    await server.close()
+
+
+async def test_one_bounds_request_per_grid_cell(
+    hass: HomeAssistant, waqi_server: FakeWAQI
+) -> None:
+    """Due stations share one bounds request per cell; feeds stay hourly."""
+    entries = []
+    for uid in POSITIONS:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            unique_id=f"@{uid}",
+            title=f"Station {uid}",
+            options={
+                "api_token": TOKEN,
+                "update_interval": 900,
+                "bounds_mode": True,
+                "rate_limit": 100.0,
+            },
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        entries.append(entry)
+    await hass.async_block_till_done()
+
+    # The first refresh needs the full feed to learn the station positions.
+    assert sorted(waqi_server.feeds) == [f"@{uid}" for uid in POSITIONS]
+    waqi_server.feeds.clear()
+
+    hub = hass.data[DOMAIN]["hubs"][TOKEN]
+    coordinators = [
+        hass.data[DOMAIN][entry.entry_id]["coordinator"] for entry in entries
+    ]
+
+    async def refresh_all() -> None:
+        for coordinator in coordinators:
+            hub._next_refresh[coordinator.station_id] = 0
+        await hub._async_refresh_due(None)
+        await hass.async_block_till_done()
+
+    # Within FEED_INTERVAL only the AQI is refreshed, one request per cell.
+    await refresh_all()
+    await refresh_all()
+    assert len(waqi_server.bounds) == 4
+    assert waqi_server.feeds == []
+    assert all(coordinator.values["aqi"] == 55 for coordinator in coordinators)
+    assert hass.states.get("sensor.station_1_aqi").state == "55"
+
+    # Once FEED_INTERVAL has passed for a station, its full feed is fetched
+    # once, and the other stations of its cell still share a bounds request.
+    coordinators[0].next_feed = 0
+    await refresh_all()
+    await refresh_all()
+    assert waqi_server.feeds == ["@1"]
+    assert len(waqi_server.bounds) == 8
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
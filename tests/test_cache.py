@@ -0,0 +1,119 @@
+"""Tests for the request coalescing and flow caches."""
+from __future__ import annotations
+
+import asyncio
+
+from . import load_module
+
+cache = load_module("cache")
+
+
+class Upstream:
+    """Fake upstream call counting how often it is sent."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return "result"
+
+
+def test_concurrent_callers_share_one_request() -> None:
+    """N identical concurrent calls reach upstream once."""
+    upstream = Upstream()
+
+    async def run() -> list[str]:
+        single_flight = cache.SingleFlight(ttl=0)
+        return await asyncio.gather(
+            *(single_flight.run("key", upstream) for _ in range(50))
+        )
+
+    assert asyncio.run(run()) == ["result"] * 50
+    assert upstream.calls == 1
+
+
+def test_result_is_reused_within_ttl() -> None:
+    """A finished result is served from memory until it expires."""
+    upstream = Upstream(delay=0)
+
+    async def run() -> None:
+        single_flight = cache.SingleFlight(ttl=60)
+        await single_flight.run("key", upstream)
+        await single_flight.run("key", upstream)
+        await single_flight.run("other", upstream)
+
+    asyncio.run(run())
+    assert upstream.calls == 2
+
+
+def test_error_reaches_every_caller() -> None:
+    """An upstream error is raised to the leader and its followers."""
+
+    async def failing() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run() -> list[object]:
+        single_flight = cache.SingleFlight(ttl=60)
+        return await asyncio.gather(
+            *(single_flight.run("key", failing) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+
+def test_follower_takes_over_from_cancelled_leader() -> None:
+    """Cancelling the leader does not fail the callers waiting on it."""
+    upstream = Upstream()
+
+    async def run() -> tuple[list[str], bool]:
+        single_flight = cache.SingleFlight(ttl=0)
+        leader = asyncio.create_task(single_flight.run("key", upstream))
+        await asyncio.sleep(0)
+        followers = [
+            asyncio.create_task(single_flight.run("key", upstream)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return results, leader.cancelled()
+
+    results, leader_cancelled = asyncio.run(run())
+    assert results == ["result"] * 3
+    assert leader_cancelled
+    assert upstream.calls == 2
+
+
+def test_cancelled_follower_is_cancelled() -> None:
+    """A follower cancelled itself still sees CancelledError."""
+    upstream = Upstream()
+
+    async def run() -> tuple[bool, str]:
+        single_flight = cache.SingleFlight(ttl=0)
+        leader = asyncio.create_task(single_flight.run("key", upstream))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight.run("key", upstream))
+        await asyncio.sleep(0)
+        follower.cancel()
+        result = await leader
+        await asyncio.gather(follower, return_exceptions=True)
+        return follower.cancelled(), result
+
+    assert asyncio.run(run()) == (True, "result")
+    assert upstream.calls == 1
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    """The oldest untouched entry makes room for a new one."""
+    lru = cache.LRUCache(maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
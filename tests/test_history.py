@@ -0,0 +1,29 @@
+"""Tests for reading WAQI history exports."""
+from __future__ import annotations
+
+from importlib import import_module
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+history = import_module("custom_components.waqi-test.history")
+
+
+def test_non_numeric_cells_are_skipped(tmp_path: Path) -> None:
+    """A bad cell drops only that value, not its row or the import."""
+    path = tmp_path / "history.csv"
+    path.write_text(
+        "date, pm25, pm10, o3\n"
+        "2024-01-01, 12, -, 30\n"
+        "2024-01-02, n/a, 7, \n"
+        "not a date, 1, 2, 3\n"
+    )
+
+    observations = history.read_history_csv(str(path))
+
+    assert [values for _, values in observations] == [
+        {"pm25": 12.0, "o3": 30.0},
+        {"pm10": 7.0},
+    ]
@@ -0,0 +1,30 @@
+"""Tests for the air quality interpolated at the home location."""
+from __future__ import annotations
+
+from importlib import import_module
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+DOMAIN = import_module("custom_components.waqi-test.const").DOMAIN
+
+
+async def test_home_entry_set_up_first(hass: HomeAssistant) -> None:
+    """The home entry loads before any station, with nothing to interpolate."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="home", title="Home", options={"neighbors": 4}
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("sensor.home_aqi").state == "unavailable"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
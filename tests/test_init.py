@@ -0,0 +1,134 @@
+"""Tests for setting up WAQI entries."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from importlib import import_module
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from .conftest import feed
+
+const = import_module("custom_components.waqi-test.const")
+
+DOMAIN = const.DOMAIN
+STALE_MAX_AGE = const.STALE_MAX_AGE
+UPDATE_INTERVAL = const.DEFAULT_UPDATE_INTERVAL
+STATIONS = 20
+
+
+async def test_cached_entries_refresh_in_their_phase(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """A restart with cached snapshots sends no burst of feed requests."""
+    observed = {"iso": dt_util.utcnow().isoformat()}
+    hass_storage[f"{DOMAIN}.feeds"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.feeds",
+        "data": {f"@{uid}": {**feed(uid), "time": observed} for uid in range(STATIONS)},
+    }
+    calls = in_flight = max_in_flight = 0
+
+    async def fake_feed(session: Any, token: str, station: str) -> dict[str, Any]:
+        nonlocal calls, in_flight, max_in_flight
+        calls += 1
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return feed(int(station[1:]))
+
+    # The throttle would serialise the requests anyway; lift it so only the
+    # phases keep them apart.
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            unique_id=f"@{uid}",
+            title=f"Station {uid}",
+            options={
+                "api_token": "token",
+                "update_interval": UPDATE_INTERVAL,
+                "rate_limit": 1000.0,
+            },
+        )
+        for uid in range(STATIONS)
+    ]
+    with patch(f"custom_components.{DOMAIN}.coordinator.async_get_feed", fake_feed):
+        for entry in entries:
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        # Every station starts from its snapshot, nothing is fetched yet.
+        assert calls == 0
+        state = hass.states.get("sensor.station_0_aqi")
+        assert state.state == "42"
+        assert state.attributes["stale"] is True
+
+        now = dt_util.utcnow()
+        for second in range(0, UPDATE_INTERVAL + 1, 5):
+            async_fire_time_changed(hass, now + timedelta(seconds=second))
+            await hass.async_block_till_done()
+
+        assert hass.states.get("sensor.station_0_aqi").attributes["stale"] is False
+        for entry in entries:
+            assert await hass.config_entries.async_unload(entry.entry_id)
+
+    assert calls == STATIONS
+    assert max_in_flight == 1
+
+
+async def test_outage_turns_sensors_unavailable(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Stale data is served during an outage until it is STALE_MAX_AGE old."""
+    payload = feed(1)
+    payload["time"] = {"iso": dt_util.utcnow().isoformat()}
+    failing = False
+
+    async def fake_feed(session: Any, token: str, station: str) -> dict[str, Any]:
+        if failing:
+            raise ValueError("Unexpected WAQI response: Unknown error")
+        return payload
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="@1",
+        title="Station 1",
+        options={"api_token": "token", "update_interval": UPDATE_INTERVAL},
+    )
+    entry.add_to_hass(hass)
+    with patch(f"custom_components.{DOMAIN}.coordinator.async_get_feed", fake_feed):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert hass.states.get("sensor.station_1_aqi").state == "42"
+
+        # Every refresh fails from now on, only the first one notifies.
+        failing = True
+        for _ in range(STALE_MAX_AGE // UPDATE_INTERVAL - 1):
+            freezer.tick(timedelta(seconds=UPDATE_INTERVAL))
+            async_fire_time_changed(hass)
+            await hass.async_block_till_done()
+        state = hass.states.get("sensor.station_1_aqi")
+        assert state.state == "42"
+        assert state.attributes["stale"] is True
+
+        freezer.tick(timedelta(seconds=2 * UPDATE_INTERVAL))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert hass.states.get("sensor.station_1_aqi").state == STATE_UNAVAILABLE
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,97 @@
+"""Tests for the publish cadence scheduler."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from . import load_module
+
+scheduler = load_module("scheduler")
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HOUR = 3600
+
+
+def simulate(
+    max_delay: float, lags: list[float], period: float = HOUR, phase: float = 0.0
+) -> tuple[float, float, float]:
+    """Poll a station publishing every period, with a lag per simulated day.
+
+    Return the polls per hour and the mean delivery delay, in seconds after
+    publication, over the last day, and the longest gap between polls.
+    """
+    cadence = scheduler.PublishCadence(max_delay, phase)
+    end = START + timedelta(days=len(lags))
+    now = START + timedelta(seconds=17)
+    polls: list[datetime] = []
+    delivered: dict[datetime, float] = {}
+
+    while now < end:
+        lag = lags[int((now - START).total_seconds() // 86400)]
+        elapsed = (now - START).total_seconds() - lag
+        observed = (
+            START + timedelta(seconds=elapsed // period * period)
+            if elapsed >= 0
+            else None
+        )
+        cadence.record(observed, now)
+        polls.append(now)
+        if observed is not None and observed not in delivered:
+            delivered[observed] = (now - observed).total_seconds() - lag
+        now += timedelta(seconds=cadence.next_delay(now))
+
+    last_day = end - timedelta(days=1)
+    delays = [delay for observed, delay in delivered.items() if observed >= last_day]
+    return (
+        sum(1 for poll in polls if poll >= last_day) / 24,
+        sum(delays) / len(delays),
+        max((b - a).total_seconds() for a, b in zip(polls, polls[1:])),
+    )
+
+
+@pytest.mark.parametrize("max_delay", [900, HOUR])
+@pytest.mark.parametrize("lag", [10, 300, 1800, 3500])
+def test_polls_once_shortly_after_publication(max_delay: float, lag: float) -> None:
+    """An hourly station is polled soon after it publishes, never past max_delay.
+
+    Polls forced by the configured interval come on top of the one aimed at
+    the publication.
+    """
+    polls_per_hour, mean_delay, longest_gap = simulate(max_delay, [lag] * 3)
+    assert polls_per_hour <= HOUR / max_delay + 1.1
+    assert mean_delay <= 2 * scheduler.PUBLISH_MARGIN
+    assert longest_gap <= max_delay
+
+
+@pytest.mark.parametrize("max_delay", [900, HOUR])
+@pytest.mark.parametrize("lags", [[300, 900, 900], [900, 300, 300]])
+def test_follows_a_changed_lag(max_delay: float, lags: list[float]) -> None:
+    """A station publishing later or earlier than before is followed."""
+    polls_per_hour, mean_delay, _ = simulate(max_delay, lags)
+    assert polls_per_hour <= HOUR / max_delay + 1.1
+    assert mean_delay <= 2 * scheduler.PUBLISH_MARGIN
+
+
+@pytest.mark.parametrize("lags", [[10, 10, 10], [900, 300, 300]])
+def test_phase_only_delays_the_poll(lags: list[float]) -> None:
+    """A station polled later by its phase still learns the lag."""
+    phase = scheduler.PUBLISH_MARGIN - 1
+    _, mean_delay, _ = simulate(HOUR, lags, phase=phase)
+    assert mean_delay <= 2 * scheduler.PUBLISH_MARGIN + phase
+
+
+def test_unknown_cadence_uses_configured_interval() -> None:
+    """Until two observations were seen, the configured interval applies."""
+    cadence = scheduler.PublishCadence(900)
+    assert cadence.next_delay(START) == 900
+    cadence.record(START, START + timedelta(minutes=5))
+    assert cadence.next_delay(START + timedelta(minutes=5)) == 900
+
+
+def test_phase_offset_is_stable_and_in_range() -> None:
+    """The offset of a station is the same on every start and below interval."""
+    offsets = {scheduler.phase_offset(f"@{uid}", 900) for uid in range(100)}
+    assert all(0 <= offset < 900 for offset in offsets)
+    assert len(offsets) > 90
+    assert scheduler.phase_offset("@1", 900) == scheduler.phase_offset("@1", 900)
@@ -0,0 +1,58 @@
+"""Tests for the offline station catalogue search."""
+from __future__ import annotations
+
+import pytest
+
+from . import load_module
+
+const = load_module("const")
+stations = load_module("stations")
+
+NAMES = [
+    "Amsterdam-Vondelpark, Netherlands",
+    "Amstetten, Austria",
+    "Beijing US Embassy, China",
+    "Bejaia, Algeria",
+    "Berlin Mitte, Germany",
+    "Bern, Switzerland",
+    "Lonato, Italy",
+    "London Marylebone Road, United Kingdom",
+    "Madras, India",
+    "Madrid Escuelas Aguirre, Spain",
+    "Paris, France",
+    "Parma, Italy",
+]
+
+
+@pytest.fixture(name="index")
+def fixture_index() -> stations.TrigramIndex:
+    """Return the name index of a small catalogue."""
+    return stations.TrigramIndex(
+        stations.Station(uid, name, 0.0, 0.0) for uid, name in enumerate(NAMES)
+    )
+
+
+@pytest.mark.parametrize(
+    ("keyword", "city"),
+    [
+        ("Berlim", "Berlin"),
+        ("Berlni", "Berlin"),
+        ("Pariss", "Paris"),
+        ("Londn", "London"),
+        ("Madrud", "Madrid"),
+        ("Beijng", "Beijing"),
+        ("Bejing", "Beijing"),
+        ("Amstredam", "Amsterdam"),
+    ],
+)
+def test_one_typo_still_matches(
+    index: stations.TrigramIndex, keyword: str, city: str
+) -> None:
+    """A city name with a typo still finds its station in the catalogue."""
+    matches = index.search(keyword, const.SEARCH_LIMIT, const.SEARCH_MIN_SCORE)
+    assert any(station.name.startswith(city) for station in matches)
+
+
+def test_unrelated_name_does_not_match(index: stations.TrigramIndex) -> None:
+    """A city missing from the catalogue falls back to the live search."""
+    assert index.search("Toronto", const.SEARCH_LIMIT, const.SEARCH_MIN_SCORE) == []
@@ -0,0 +1,49 @@
+"""Tests for the request throttle of a token."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("waqi_client_async")
+
+from . import load_module
+
+throttle = load_module("throttle")
+
+
+def test_restore_resumes_todays_usage() -> None:
+    """Requests counted before a restart still count against the budget."""
+    limiter = throttle.RequestThrottle(rate=1000, daily_budget=10)
+    limiter.restore(limiter.day, 9)
+    assert limiter.budget_used == 90.0
+
+    async def run() -> None:
+        await limiter.acquire()
+        with pytest.raises(throttle.BudgetExhausted):
+            await limiter.acquire()
+
+    asyncio.run(run())
+
+
+def test_restore_ignores_another_day() -> None:
+    """Usage saved on an earlier UTC day does not carry over."""
+    limiter = throttle.RequestThrottle(rate=1000, daily_budget=10)
+    limiter.restore(limiter.day - timedelta(days=1), 9)
+    assert limiter.used_today == 0
+
+
+def test_invalid_token_can_be_checked_again() -> None:
+    """A rejected token is blocked locally until a flow tries it again."""
+    breaker = throttle.CircuitBreaker(base=60, maximum=3600)
+    breaker.record_invalid_token()
+    with pytest.raises(throttle.waqi.InvalidToken):
+        breaker.check()
+
+    breaker.reset_invalid_token()
+    breaker.check()
+
+    breaker.record_invalid_token()
+    breaker.record_success()
+    breaker.check()